@@ -19,11 +19,12 @@ from typing import Iterable
 
 import nibabel
 import nilearn.datasets
-import nilearn.image
 import nilearn.plotting
 import numpy as np
+import pandas as pd
 from neurolang.frontend import ExplicitVBR, ExplicitVBROverlay, NeurolangPDL
 from neurolang.frontend.neurosynth_utils import get_ns_mni_peaks_reported
+from neurolang.regions import resampled_affine_and_shape, world_to_voxel
 
 # ##############################################################################
 # Data preparation
@@ -37,7 +38,7 @@ data_dir = Path.home() / "neurolang_data"
 mni_t1 = nibabel.load(
     nilearn.datasets.fetch_icbm152_2009(data_dir=str(data_dir / "icbm"))["t1"]
 )
-mni_t1_2mm = nilearn.image.resample_img(mni_t1, np.eye(3) * 2)
+mni_2mm_affine, mni_2mm_shape = resampled_affine_and_shape(mni_t1, 2)
 
 # ##############################################################################
 # Probabilistic Logic Programming in NeuroLang
@@ -55,9 +56,12 @@ nl = NeurolangPDL()
 def agg_create_region_overlay(
     i: Iterable, j: Iterable, k: Iterable, p: Iterable
 ) -> ExplicitVBR:
-    voxels = np.c_[i, j, k]
+    voxels = np.empty((len(i), 3), dtype=int)
+    voxels[:, 0] = i
+    voxels[:, 1] = j
+    voxels[:, 2] = k
     return ExplicitVBROverlay(
-        voxels, mni_t1_2mm.affine, p, image_dim=mni_t1_2mm.shape
+        voxels, mni_2mm_affine, p, image_dim=mni_2mm_shape
     )
 
 
@@ -66,36 +70,58 @@ def agg_create_region_overlay(
 # ----------------------------------
 
 peak_data = get_ns_mni_peaks_reported(data_dir)
-ijk_positions = np.round(
-    nibabel.affines.apply_affine(
-        np.linalg.inv(mni_t1_2mm.affine),
-        peak_data[["x", "y", "z"]].values.astype(float),
-    )
-).astype(int)
-peak_data["i"] = ijk_positions[:, 0]
-peak_data["j"] = ijk_positions[:, 1]
-peak_data["k"] = ijk_positions[:, 2]
-peak_data = peak_data[["i", "j", "k", "id"]]
+ijk_positions = world_to_voxel(
+    peak_data[["x", "y", "z"]].to_numpy(dtype=np.float32), mni_2mm_affine
+)
+peak_reported = pd.DataFrame(ijk_positions, columns=["i", "j", "k"])
+peak_reported["id"] = peak_data["id"].values
 
-nl.add_tuple_set(peak_data, name="FocusReported")
 study_ids = nl.load_neurosynth_study_ids(data_dir, "Study")
 nl.add_uniform_probabilistic_choice_over_set(
     study_ids.value, name="SelectedStudy"
 )
 nl.load_neurosynth_term_study_associations(
-    data_dir, "TermInStudyTFIDF", tfidf_threshold=1e-3
+    data_dir, "TermInStudyTFIDF", tfidf_threshold=1e-3, terms=["emotion"]
 )
-Voxel = nl.add_tuple_set(
-    np.hstack(
-        np.meshgrid(
-            *(np.arange(0, dim) for dim in mni_t1_2mm.get_fdata().shape)
-        )
-    )
-    .swapaxes(0, 1)
-    .reshape(3, -1)
-    .T,
-    name="Voxel",
+
+# ##############################################################################
+# Computing the spatial prior
+# ----------------------------------
+# The probability of a voxel being reported by a study decays exponentially
+# with its distance to the closest focus reported by that study. Rather than
+# evaluating the distance and the exponential for every (voxel, focus) pair
+# within the probabilistic program, they are computed once with NumPy over
+# the neighbourhood of each focus, and the resulting probabilities are added
+# as probabilistic facts.
+
+max_distance = 1
+offsets = np.stack(
+    np.meshgrid(*(np.arange(-max_distance, max_distance + 1),) * 3),
+    axis=-1,
+).reshape(-1, 3)
+distances = np.linalg.norm(offsets, axis=1)
+offsets = offsets[distances < max_distance]
+distances = distances[distances < max_distance]
+
+voxels = (
+    peak_reported[["i", "j", "k"]].values[:, None, :] + offsets[None, :, :]
+).reshape(-1, 3)
+voxel_reported = pd.DataFrame(
+    {
+        "p": np.tile(np.exp(-distances / 5.0), len(peak_reported)),
+        "i": voxels[:, 0],
+        "j": voxels[:, 1],
+        "k": voxels[:, 2],
+        "s": np.repeat(peak_reported["id"].values, len(offsets)),
+    }
 )
+in_image = np.all((voxels >= 0) & (voxels < mni_2mm_shape), axis=1)
+voxel_reported = (
+    voxel_reported[in_image]
+    .groupby(["i", "j", "k", "s"], as_index=False)["p"]
+    .max()[["p", "i", "j", "k", "s"]]
+)
+nl.add_probabilistic_facts_from_tuples(voxel_reported, name="VoxelReported")
 
 # ##############################################################################
 # Probabilistic program and querying
@@ -103,12 +129,6 @@ Voxel = nl.add_tuple_set(
 
 
 with nl.environment as e:
-    (e.VoxelReported @ e.max(e.exp(-e.d / 5.0)))[e.i1, e.j1, e.k1, e.s] = (
-        e.FocusReported(e.i2, e.j2, e.k2, e.s)
-        & e.Voxel(e.i1, e.j1, e.k1)
-        & (e.d == e.EUCLIDEAN(e.i1, e.j1, e.k1, e.i2, e.j2, e.k2))
-        & (e.d < 1)
-    )
     e.TermAssociation[e.t] = (
         e.SelectedStudy[e.s] & e.TermInStudyTFIDF[e.s, e.t, ...]
     )
@@ -6,6 +6,7 @@ NeuroLang Example based Implementing a NeuroSynth Query
 """
 
 # %%
+import hashlib
 import warnings
 
 warnings.filterwarnings("ignore")
@@ -15,12 +16,12 @@ from typing import Iterable
 
 import nibabel
 import nilearn.datasets
-import nilearn.image
 import nilearn.plotting
 import numpy as np
 import pandas as pd
 from neurolang import ExplicitVBROverlay, NeurolangPDL
 from neurolang.frontend.neurosynth_utils import get_ns_mni_peaks_reported
+from neurolang.regions import resampled_affine_and_shape, world_to_voxel
 
 ###############################################################################
 # Data preparation
@@ -34,7 +35,7 @@ data_dir = Path.home() / "neurolang_data"
 mni_t1 = nibabel.load(
     nilearn.datasets.fetch_icbm152_2009(data_dir=str(data_dir / "icbm"))["t1"]
 )
-mni_t1_4mm = nilearn.image.resample_img(mni_t1, np.eye(3) * 4)
+mni_4mm_affine, mni_4mm_shape = resampled_affine_and_shape(mni_t1, 4)
 
 ###############################################################################
 # Probabilistic Logic Programming in NeuroLang
@@ -51,34 +52,47 @@ nl = NeurolangPDL()
 def agg_create_region_overlay(
     i: Iterable, j: Iterable, k: Iterable, p: Iterable
 ) -> ExplicitVBROverlay:
-    mni_coords = np.c_[i, j, k]
+    mni_coords = np.empty((len(i), 3), dtype=int)
+    mni_coords[:, 0] = i
+    mni_coords[:, 1] = j
+    mni_coords[:, 2] = k
     return ExplicitVBROverlay(
-        mni_coords, mni_t1_4mm.affine, p, image_dim=mni_t1_4mm.shape
+        mni_coords, mni_4mm_affine, p, image_dim=mni_4mm_shape
     )
 
 
 ###############################################################################
-# Load the NeuroSynth database
-
-peak_data = get_ns_mni_peaks_reported(data_dir)
-ijk_positions = np.round(
-    nibabel.affines.apply_affine(
-        np.linalg.inv(mni_t1_4mm.affine),
-        peak_data[["x", "y", "z"]].values.astype(float),
+# Load the NeuroSynth database. The peaks mapped to the voxels of the 4mm
+# atlas do not change between runs, so they are cached in the data directory
+# under a key derived from the atlas affine.
+
+cache_dir = data_dir / "cache"
+peak_reported_file = cache_dir / (
+    "peak_reported_"
+    + hashlib.sha256(mni_4mm_affine.tobytes()).hexdigest()[:16]
+    + ".pkl"
+)
+if peak_reported_file.exists():
+    peak_reported = pd.read_pickle(peak_reported_file)
+else:
+    peak_data = get_ns_mni_peaks_reported(data_dir)
+    ijk_positions = world_to_voxel(
+        peak_data[["x", "y", "z"]].to_numpy(dtype=np.float32), mni_4mm_affine
     )
-).astype(int)
-peak_data["i"] = ijk_positions[:, 0]
-peak_data["j"] = ijk_positions[:, 1]
-peak_data["k"] = ijk_positions[:, 2]
-peak_data = peak_data[["i", "j", "k", "id"]]
-
-nl.add_tuple_set(peak_data, name="PeakReported")
+    peak_reported = pd.DataFrame(ijk_positions, columns=["i", "j", "k"])
+    peak_reported["id"] = peak_data["id"].values
+    # several peaks of a study often fall in the same 4mm voxel
+    peak_reported = peak_reported.drop_duplicates(ignore_index=True)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    peak_reported.to_pickle(peak_reported_file)
+
+nl.add_tuple_set(peak_reported, name="PeakReported")
 study_ids = nl.load_neurosynth_study_ids(data_dir, "Study")
 nl.add_uniform_probabilistic_choice_over_set(
     study_ids.value, name="SelectedStudy"
 )
 nl.load_neurosynth_term_study_associations(
-    data_dir, "TermInStudyTFIDF", tfidf_threshold=1e-3
+    data_dir, "TermInStudyTFIDF", tfidf_threshold=1e-3, terms=["auditory"]
 )
 
 
@@ -87,9 +101,9 @@ nl.load_neurosynth_term_study_associations(
 # Probabilistic program and querying
 
 with nl.scope as e:
-    e.Activation[e.i, e.j, e.k] = e.PeakReported(
+    e.Activation[e.i, e.j, e.k] = e.SelectedStudy(e.s) & e.PeakReported(
         e.i, e.j, e.k, e.s
-    ) & e.SelectedStudy(e.s)
+    )
     e.TermAssociation[e.t] = e.SelectedStudy(e.s) & e.TermInStudyTFIDF(
         e.s, e.t, ...
     )
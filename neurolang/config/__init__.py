@@ -69,6 +69,25 @@ class NeurolangConfigParser(configparser.ConfigParser):
     def disable_probabilistic_solver_check_unate(self):
         self.set("PROBABILISTIC_SOLVER", "check_unate", "False")
 
+    def get_probabilistic_solver_minimize_max_formulas(self):
+        return self.getint(
+            "PROBABILISTIC_SOLVER", "minimize_max_formulas", fallback=64
+        )
+
+    def set_probabilistic_solver_minimize_max_formulas(self, max_formulas):
+        self.set(
+            "PROBABILISTIC_SOLVER", "minimize_max_formulas", str(max_formulas)
+        )
+
+    def get_parser_grammar_disk_cache(self):
+        return self.getboolean("PARSER", "grammar_disk_cache", fallback=False)
+
+    def enable_parser_grammar_disk_cache(self):
+        self.set("PARSER", "grammar_disk_cache", "True")
+
+    def disable_parser_grammar_disk_cache(self):
+        self.set("PARSER", "grammar_disk_cache", "False")
+
 
 config = NeurolangConfigParser()
 
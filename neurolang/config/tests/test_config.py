@@ -44,3 +44,23 @@ def test_switch_expression_type_printing():
 
     config.disable_expression_type_printing()
     assert not config.expression_type_printing()
+
+
+def test_probabilistic_solver_minimize_max_formulas():
+    old = config.get_probabilistic_solver_minimize_max_formulas()
+    try:
+        config.set_probabilistic_solver_minimize_max_formulas(3)
+        assert config.get_probabilistic_solver_minimize_max_formulas() == 3
+    finally:
+        config.set_probabilistic_solver_minimize_max_formulas(old)
+
+
+def test_parser_grammar_disk_cache():
+    old = config.get_parser_grammar_disk_cache()
+    try:
+        config.enable_parser_grammar_disk_cache()
+        assert config.get_parser_grammar_disk_cache()
+        config.disable_parser_grammar_disk_cache()
+        assert not config.get_parser_grammar_disk_cache()
+    finally:
+        config.set("PARSER", "grammar_disk_cache", str(old))
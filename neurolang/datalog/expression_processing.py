@@ -773,7 +773,7 @@ class FlattenQueryInNonRecursiveUCQ(PatternWalker):
             else:
                 new_formulas += (new_formula,)
         if len(new_formulas) > 0:
-            res = Conjunction(tuple(new_formulas))
+            res = Conjunction(tuple(dict.fromkeys(new_formulas)))
         else:
             res = new_formulas[0]
         return res
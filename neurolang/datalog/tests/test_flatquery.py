@@ -243,3 +243,10 @@ def test_flatten_query_double_vareq():
     flat = flatten_query(query, program)
     assert isinstance(flat, Conjunction)
     assert set(flat.formulas) == {R(a), R(b)}
+
+
+def test_flatten_query_removes_duplicated_conjuncts():
+    program = TestDatalogProgram()
+    program.walk(Implication(Q(x), Conjunction((P(x), R(x)))))
+    result = flatten_query(Conjunction((Q(x), P(x))), program)
+    assert result == Conjunction((P(x), R(x)))
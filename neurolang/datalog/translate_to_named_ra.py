@@ -99,12 +99,12 @@ class TranslateToNamedRA(ExpressionBasicEvaluator):
 
     @add_match(FunctionApplication(EQ_pattern, ...))
     def translate_eq(self, expression):
-        new_args = tuple()
+        new_args = []
         changed = False
         for arg in expression.args:
             new_arg = self.walk(arg)
             changed |= new_arg is not arg
-            new_args += (new_arg,)
+            new_args.append(new_arg)
 
         if changed:
             return EQ(*new_args)
@@ -117,7 +117,7 @@ class TranslateToNamedRA(ExpressionBasicEvaluator):
     )
     def translate_builtin_fa(self, expression):
         args = expression.args
-        new_args = tuple()
+        new_args = []
         changed = False
         for arg in args:
             new_arg = self.walk(arg)
@@ -136,10 +136,10 @@ class TranslateToNamedRA(ExpressionBasicEvaluator):
                 changed |= True
             else:
                 changed |= new_arg is not arg
-            new_args += (new_arg,)
+            new_args.append(new_arg)
 
         if changed:
-            res = FunctionApplication(expression.functor, new_args)
+            res = FunctionApplication(expression.functor, tuple(new_args))
         else:
             res = expression
         return res
@@ -297,7 +297,10 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
             '\033[1m\033[91mExpression\033[0m: %(expression)s',
             {'expression': expression}
         )
-        for pattern, guard, action in self.patterns:
+        candidate_patterns = _patterns_for_expression_class(
+            self.__class__, expression.__class__
+        )
+        for pattern, guard, action in candidate_patterns:
             name = '\033[1m\033[91m' + action.__qualname__ + '\033[0m'
             pattern_match = self.pattern_match(pattern, expression)
             guard_match = pattern_match and (
@@ -491,6 +494,44 @@ class PatternMatcher(metaclass=PatternMatchingMetaClass):
         return result
 
 
+def _generic_class(cls):
+    if getattr(cls, '__parameterized__', False):
+        return cls.__generic_class__
+    return cls
+
+
+@lru_cache(maxsize=4096)
+def _patterns_for_expression_class(matcher_class, expression_class):
+    """Patterns of ``matcher_class`` which could match an instance of
+    ``expression_class``, in order.
+
+    Only the class of the pattern is taken into account, disregarding
+    its type parameter, hence the filter never discards a pattern
+    which would have matched.
+    """
+    expression_generic_class = _generic_class(expression_class)
+    candidate_patterns = []
+    for pattern_guard_action in chain(*(
+        pm.__patterns__ for pm in matcher_class.mro()
+        if hasattr(pm, '__patterns__')
+    )):
+        pattern = pattern_guard_action[0]
+        if isclass(pattern) and issubclass(pattern, expressions.Expression):
+            pattern_class = pattern
+        elif isinstance(pattern, expressions.Expression):
+            pattern_class = type(pattern)
+        else:
+            pattern_class = None
+        if (
+            pattern_class is None or
+            issubclass(
+                expression_generic_class, _generic_class(pattern_class)
+            )
+        ):
+            candidate_patterns.append(pattern_guard_action)
+    return tuple(candidate_patterns)
+
+
 @lru_cache(maxsize=128)
 def signature(cls):
     return inspect.signature(cls).parameters
@@ -200,7 +200,7 @@ class ExpressionWalker(PatternWalker):
     @add_match(Expression)
     def process_expression(self, expression):
         args = expression.unapply()
-        new_args = tuple()
+        new_args = []
         changed = False
         for arg in args:
             if isinstance(arg, Expression):
@@ -219,7 +219,7 @@ class ExpressionWalker(PatternWalker):
                 )
             else:
                 new_arg = arg
-            new_args += (new_arg,)
+            new_args.append(new_arg)
 
         if changed:
             new_expression = expression.apply(*new_args)
@@ -274,7 +274,7 @@ class ReplaceExpressionWalker(ExpressionWalker):
 
     def replace_expression(self, expression):
         args = expression.unapply()
-        new_args = tuple()
+        new_args = []
         changed = False
         for arg in args:
             if isinstance(arg, Expression):
@@ -289,7 +289,7 @@ class ReplaceExpressionWalker(ExpressionWalker):
                 )
             else:
                 new_arg = arg
-            new_args += (new_arg,)
+            new_args.append(new_arg)
         if changed:
             return expression.apply(*new_args)
         else:
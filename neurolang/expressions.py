@@ -7,7 +7,7 @@ import types
 import typing
 from contextlib import contextmanager
 from functools import WRAPPER_ASSIGNMENTS, lru_cache, wraps
-from itertools import chain
+from itertools import chain, count
 from warnings import warn
 import warnings
 
@@ -472,20 +472,19 @@ class Symbol(NonConstant):
 
     @staticmethod
     def _fresh_generator():
-        lock = threading.RLock()
-        i = 0
-        while True:
-            with lock:
-                fresh = f'fresh_{i:08}'
-                i += 1
-            yield fresh
+        # map and count are implemented in C, hence each call to
+        # next is atomic and no lock is needed to share the generator
+        return map('fresh_{:08}'.format, count())
 
     @classmethod
     def fresh(cls):
         if not hasattr(Symbol, '_fresh_generator_'):
             Symbol._fresh_generator_ = Symbol._fresh_generator()
         new_symbol = cls(next(Symbol._fresh_generator_))
-        if cls.type is not typing.Any:
+        if (
+            cls.type is not typing.Any and
+            new_symbol.type is not cls.type
+        ):
             new_symbol = new_symbol.cast(cls.type)
         new_symbol.is_fresh = True
         return new_symbol
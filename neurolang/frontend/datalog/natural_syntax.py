@@ -1,7 +1,3 @@
-from operator import add, eq, ge, gt, le, lt, mul, ne, pow, sub, truediv
-
-import tatsu
-
 from ...datalog import Implication
 from ...datalog.aggregation import AggregationApplication
 from ...expressions import Expression, FunctionApplication
@@ -9,6 +5,7 @@ from ...probabilistic.expressions import (
     ProbabilisticFact,
 )
 from .standard_syntax import DatalogSemantics as DatalogClassicSemantics
+from .standard_syntax import compile_grammar
 
 GRAMMAR = u"""
     @@grammar::Datalog
@@ -107,13 +104,12 @@ GRAMMAR = u"""
 
     comparison_operator = '==' | '<' | '<=' | '>=' | '>' | '!=' ;
 
-    text = '"' /[a-zA-Z0-9 ]*/ '"'
-          | "'" /[a-zA-Z0-9 ]*/ "'" ;
+    text = /"[a-zA-Z0-9 ]*"/
+         | /'[a-zA-Z0-9 ]*'/ ;
 
     number = float | integer ;
-    integer = [ '+' | '-' ] /[0-9]+/ ;
-    float = /[0-9]*/'.'/[0-9]+/
-          | /[0-9]+/'.'/[0-9]*/ ;
+    integer = /[+-]?[0-9]+/ ;
+    float = /[0-9]*\.[0-9]+|[0-9]+\.[0-9]*/ ;
 
     logical_constant = TRUE | FALSE ;
     TRUE = 'True' | '\u22A4' ;
@@ -123,24 +119,6 @@ GRAMMAR = u"""
 """
 
 
-OPERATOR = {
-    "+": add,
-    "-": sub,
-    "==": eq,
-    ">=": ge,
-    ">": gt,
-    "<=": le,
-    "<": lt,
-    "*": mul,
-    "!=": ne,
-    "**": pow,
-    "/": truediv,
-}
-
-
-COMPILED_GRAMMAR = tatsu.compile(GRAMMAR)
-
-
 class DatalogSemantics(DatalogClassicSemantics):
     def constant_predicate(self, ast):
         return ast["predicate"](*ast["arguments"])
@@ -177,8 +155,7 @@ class DatalogSemantics(DatalogClassicSemantics):
 
 
 def parser(code, locals=None, globals=None):
-    return tatsu.parse(
-        COMPILED_GRAMMAR,
+    return compile_grammar(GRAMMAR).parse(
         code.strip(),
         semantics=DatalogSemantics(locals=locals, globals=globals),
     )
@@ -1,9 +1,15 @@
+import hashlib
+import os
+import pickle
+from functools import lru_cache
 from operator import add, eq, ge, gt, le, lt, mul, ne, pow, sub, truediv
+from pathlib import Path
 
 import tatsu
 
 from neurolang.logic import ExistentialPredicate
 
+from ...config import config
 from ...datalog import Conjunction, Fact, Implication, Negation, Union
 from ...datalog.constraints_representation import RightImplication
 from ...expressions import (
@@ -57,9 +63,6 @@ GRAMMAR = u"""
                         | predicate ;
     exists = 'exists' | '\u2203' | 'EXISTS';
     such_that = 'st' | ';' ;
-    reserved_words = exists
-                   | 'st'
-                   | 'ans' ;
 
     conjunction_symbol = ',' | '&' | '\N{LOGICAL AND}' ;
     implication = ':-' | '\N{LEFTWARDS ARROW}' ;
@@ -113,10 +116,10 @@ GRAMMAR = u"""
             | text
             | ext_identifier ;
 
-    identifier = !reserved_words /[a-zA-Z_][a-zA-Z0-9_]*/
+    identifier = /(?!(exists|EXISTS|ans|st)(?![^\W_]))[a-zA-Z_][a-zA-Z0-9_]*/
                | '`'@:?"[0-9a-zA-Z/#%._:-]+"'`';
 
-    cmd_identifier = !reserved_words /[a-zA-Z_][a-zA-Z0-9_]*/ ;
+    cmd_identifier = /(?!(exists|EXISTS|ans|st)(?![^\W_]))[a-zA-Z_][a-zA-Z0-9_]*/ ;
     cmd_args = @:pos_args [ ',' @:keyword_args ]
              | @:keyword_args ;
     pos_args = pos_item { ',' pos_item }* ;
@@ -128,13 +131,12 @@ GRAMMAR = u"""
 
     comparison_operator = '==' | '<' | '<=' | '>=' | '>' | '!=' ;
 
-    text = '"' /[a-zA-Z0-9 ]*/ '"'
-          | "'" /[a-zA-Z0-9 ]*/ "'" ;
+    text = /"[a-zA-Z0-9 ]*"/
+         | /'[a-zA-Z0-9 ]*'/ ;
 
     number = float | integer ;
-    integer = [ '+' | '-' ] /[0-9]+/ ;
-    float = [ '+' | '-' ] /[0-9]*/'.'/[0-9]+/
-          | [ '+' | '-' ] /[0-9]+/'.'/[0-9]*/ ;
+    integer = /[+-]?[0-9]+/ ;
+    float = /[+-]?([0-9]*\.[0-9]+|[0-9]+\.[0-9]*)/ ;
     logical_constant = TRUE | FALSE ;
     TRUE = 'True' | '\u22A4' ;
     FALSE = 'False' | '\u22A5' ;
@@ -158,7 +160,67 @@ OPERATOR = {
 }
 
 
-COMPILED_GRAMMAR = tatsu.compile(GRAMMAR)
+OPERATOR_CONSTANT = {
+    symbol: Constant(operator) for symbol, operator in OPERATOR.items()
+}
+
+
+ANS = Symbol("ans")
+MINUS_ONE = Constant(-1)
+TRUE = Constant(True)
+
+
+def _grammar_cache_dir():
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "neurolang"
+
+
+@lru_cache(maxsize=None)
+def compile_grammar(grammar):
+    """
+    Compile a tatsu grammar. Compiling takes about a second per grammar,
+    hence this is only done the first time a grammar is used. If the
+    `grammar_disk_cache` option of the `PARSER` configuration section
+    is set, the model pickled in `$XDG_CACHE_HOME/neurolang` by a previous
+    process is reused.
+
+    Parameters
+    ----------
+    grammar : str
+        EBNF grammar in tatsu syntax.
+
+    Returns
+    -------
+    tatsu.grammars.Grammar
+        compiled grammar model.
+    """
+    if not config.get_parser_grammar_disk_cache():
+        return tatsu.compile(grammar)
+
+    key = hashlib.sha256(
+        (tatsu.__version__ + grammar).encode("utf8")
+    ).hexdigest()
+    cache_dir = _grammar_cache_dir()
+    cache_file = cache_dir / f"grammar_{key}.pickle"
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.PickleError, EOFError):
+        pass
+
+    model = tatsu.compile(grammar)
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "wb") as f:
+            pickle.dump(model, f)
+        os.replace(tmp_file, cache_file)
+    except (OSError, pickle.PickleError):
+        pass
+    finally:
+        if tmp_file.exists():
+            tmp_file.unlink()
+    return model
 
 
 class ExternalSymbol(Symbol):
@@ -192,7 +254,7 @@ class DatalogSemantics:
     def probabilistic_fact(self, ast):
         return Implication(
             ProbabilisticFact(ast[0], ast[2]),
-            Constant(True),
+            TRUE,
         )
 
     def constant_predicate(self, ast):
@@ -200,7 +262,7 @@ class DatalogSemantics:
 
     def rule(self, ast):
         head = ast[0]
-        if isinstance(head, Expression) and head.functor == Symbol("ans"):
+        if isinstance(head, Expression) and head.functor == ANS:
             return Query(ast[0], ast[2])
         else:
             return Implication(ast[0], ast[2])
@@ -270,10 +332,10 @@ class DatalogSemantics:
         if len(ast) == 3:
             # Query head has arguments
             arguments = ast[1]
-            return Symbol("ans")(*arguments)
+            return ANS(*arguments)
         else:
             # Query head has no arguments
-            return Symbol("ans")()
+            return ANS()
 
     def predicate(self, ast):
         if not isinstance(ast, Expression):
@@ -295,7 +357,7 @@ class DatalogSemantics:
         return exp
 
     def comparison(self, ast):
-        operator = Constant(OPERATOR[ast[1]])
+        operator = OPERATOR_CONSTANT[ast[1]]
         return operator(ast[0], ast[2])
 
     def arguments(self, ast):
@@ -311,33 +373,18 @@ class DatalogSemantics:
         return Lambda(ast[1], ast[3])
 
     def arithmetic_operation(self, ast):
-        if isinstance(ast, Expression):
-            return ast
-
-        if len(ast) == 1:
-            return ast[0]
-
-        op = Constant(OPERATOR[ast[1]])
-
-        return op(*ast[0::2])
-
-    def term(self, ast):
         if isinstance(ast, Expression):
             return ast
         elif len(ast) == 1:
             return ast[0]
 
-        op = Constant(OPERATOR[ast[1]])
+        op = OPERATOR_CONSTANT[ast[1]]
 
         return op(ast[0], ast[2])
 
-    def factor(self, ast):
-        if isinstance(ast, Expression):
-            return ast
-        elif len(ast) == 1:
-            return ast[0]
-        else:
-            return Constant(pow)(ast[0], ast[2])
+    term = arithmetic_operation
+
+    factor = arithmetic_operation
 
     def function_application(self, ast):
         if not isinstance(ast[0], Expression):
@@ -350,7 +397,7 @@ class DatalogSemantics:
         if isinstance(ast, Expression):
             return ast
         else:
-            return Constant(mul)(Constant(-1), ast[1])
+            return OPERATOR_CONSTANT["*"](MINUS_ONE, ast[1])
 
     def identifier(self, ast):
         return Symbol(ast)
@@ -362,13 +409,13 @@ class DatalogSemantics:
             return ast
 
     def text(self, ast):
-        return Constant(ast[1])
+        return Constant(ast[1:-1])
 
     def integer(self, ast):
-        return Constant(int("".join(ast)))
+        return Constant(int(ast))
 
     def float(self, ast):
-        return Constant(float("".join(ast)))
+        return Constant(float(ast))
 
     def cmd_identifier(self, ast):
         return Symbol(ast)
@@ -419,8 +466,7 @@ class DatalogSemantics:
 
 
 def parser(code, locals=None, globals=None):
-    return tatsu.parse(
-        COMPILED_GRAMMAR,
+    return compile_grammar(GRAMMAR).parse(
         code.strip(),
         semantics=DatalogSemantics(locals=locals, globals=globals),
     )
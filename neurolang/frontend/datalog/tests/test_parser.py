@@ -20,6 +20,7 @@ from ....probabilistic.expressions import (
     Condition,
     ProbabilisticFact
 )
+from .. import standard_syntax
 from ..standard_syntax import ExternalSymbol, parser
 
 
@@ -471,3 +472,49 @@ def test_command_syntax():
         )
     )
     assert res == expected
+
+
+def test_compiled_grammar_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(
+        standard_syntax.config, "get_parser_grammar_disk_cache", lambda: True
+    )
+    grammar = "start = /[a-z]+/ $ ;"
+
+    model = standard_syntax.compile_grammar.__wrapped__(grammar)
+    cache_files = list(tmp_path.glob("neurolang/*"))
+    assert len(cache_files) == 1
+    assert cache_files[0].match("grammar_*.pickle")
+
+    def fail_compile(grammar):
+        raise AssertionError("grammar should be loaded from the cache")
+
+    monkeypatch.setattr(standard_syntax.tatsu, "compile", fail_compile)
+    cached_model = standard_syntax.compile_grammar.__wrapped__(grammar)
+    assert cached_model.parse("abc") == model.parse("abc") == "abc"
+
+
+def test_compiled_grammar_corrupt_disk_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(
+        standard_syntax.config, "get_parser_grammar_disk_cache", lambda: True
+    )
+    grammar = "start = /[a-z]+/ $ ;"
+
+    standard_syntax.compile_grammar.__wrapped__(grammar)
+    cache_file, = tmp_path.glob("neurolang/grammar_*.pickle")
+    cache_file.write_bytes(b"corrupt")
+
+    model = standard_syntax.compile_grammar.__wrapped__(grammar)
+    assert model.parse("abc") == "abc"
+    assert list(tmp_path.glob("neurolang/*")) == [cache_file]
+
+
+def test_compiled_grammar_disk_cache_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    monkeypatch.setattr(
+        standard_syntax.config, "get_parser_grammar_disk_cache", lambda: False
+    )
+    model = standard_syntax.compile_grammar.__wrapped__("start = /[a-z]+/ $ ;")
+    assert model.parse("abc") == "abc"
+    assert not any(tmp_path.iterdir())
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -72,6 +72,46 @@ def fetch_study_metadata(
     return metadata
 
 
+def _fetch_sparse_feature_data(
+    data_dir: Path,
+    version: int = 7,
+    verbose: int = 1,
+    convert_study_ids: bool = False,
+) -> Tuple[sparse.spmatrix, pd.Series, List[str]]:
+    """
+    Download if needed the `tfidf_features.npz` file from Neurosynth and
+    load it as a sparse matrix of size N x P, along with the N study ids
+    and the P feature names.
+    """
+    file_names = [
+        f"data-neurosynth_version-{version}_vocab-terms_source-abstract_type-tfidf_features.npz",
+        f"data-neurosynth_version-{version}_vocab-terms_vocabulary.txt",
+    ]
+    files = _fetch_files(
+        data_dir,
+        [
+            (
+                fn,
+                NS_DATA_URL + fn,
+                {},
+            )
+            for fn in file_names
+        ],
+        verbose=verbose,
+    )
+    feature_data_sparse = sparse.load_npz(files[0])
+    metadata_df = fetch_study_metadata(data_dir, version, verbose)
+    ids = metadata_df["id"]
+    if convert_study_ids:
+        ids = ids.apply(StudyID)
+    feature_names = np.genfromtxt(
+        files[1],
+        dtype=str,
+        delimiter="\t",
+    ).tolist()
+    return feature_data_sparse, ids, feature_names
+
+
 def fetch_feature_data(
     data_dir: Path,
     version: int = 7,
@@ -106,33 +146,10 @@ def fetch_feature_data(
     pd.DataFrame
         the features dataframe
     """
-    file_names = [
-        f"data-neurosynth_version-{version}_vocab-terms_source-abstract_type-tfidf_features.npz",
-        f"data-neurosynth_version-{version}_vocab-terms_vocabulary.txt",
-    ]
-    files = _fetch_files(
-        data_dir,
-        [
-            (
-                fn,
-                NS_DATA_URL + fn,
-                {},
-            )
-            for fn in file_names
-        ],
-        verbose=verbose,
+    feature_data_sparse, ids, feature_names = _fetch_sparse_feature_data(
+        data_dir, version, verbose, convert_study_ids
     )
-    feature_data_sparse = sparse.load_npz(files[0])
     feature_data = feature_data_sparse.todense()
-    metadata_df = fetch_study_metadata(data_dir, version, verbose)
-    ids = metadata_df["id"]
-    if convert_study_ids:
-        ids = ids.apply(StudyID)
-    feature_names = np.genfromtxt(
-        files[1],
-        dtype=str,
-        delimiter="\t",
-    ).tolist()
     feature_df = pd.DataFrame(
         index=ids.tolist(), columns=feature_names, data=feature_data
     )
@@ -214,6 +231,7 @@ def get_ns_term_study_associations(
     verbose: int = 1,
     convert_study_ids: bool = False,
     tfidf_threshold: Optional[float] = None,
+    terms: Optional[Iterable[str]] = None,
 ) -> pd.DataFrame:
     """
     Load a dataframe containing associations between term and studies.
@@ -222,6 +240,7 @@ def get_ns_term_study_associations(
     comes the tfidf value for the term in the study.
     If a tfidf threshold value is passed, only (term, study) associations
     with a tfidf value > tfidf_threshold will be kept.
+    If terms are passed, only associations for those terms will be kept.
 
     Parameters
     ----------
@@ -236,26 +255,46 @@ def get_ns_term_study_associations(
     tfidf_threshold : Optional[float], optional
         the minimum tfidf value for the (term, study) associations,
         by default None
+    terms : Optional[Iterable[str]], optional
+        the terms for which associations are loaded, all terms in the
+        vocabulary if None, by default None
 
     Returns
     -------
     pd.DataFrame
         the term association dataframe
     """
-    features = fetch_feature_data(
+    if terms is not None:
+        terms = list(terms)
+    tfidf, ids, feature_names = _fetch_sparse_feature_data(
         data_dir, version, verbose, convert_study_ids
     )
-    features.index.name = "id"
-    term_data = pd.melt(
-        features.reset_index(),
-        var_name="term",
-        id_vars="id",
-        value_name="tfidf",
+    tfidf = tfidf.tocsc()
+    feature_names = np.asarray(feature_names)
+    if terms is not None:
+        term_columns = pd.Index(feature_names).get_indexer(terms)
+        if (term_columns < 0).any():
+            raise KeyError(
+                f"Terms not in the vocabulary: "
+                f"{[t for t, c in zip(terms, term_columns) if c < 0]}"
+            )
+        tfidf = tfidf[:, term_columns]
+        feature_names = feature_names[term_columns]
+    if tfidf_threshold is None:
+        tfidf_threshold = 0
+    # extract the (term, study) pairs above the threshold straight from the
+    # stored entries of the sparse matrix, in the same order as a melt of
+    # the features table would produce them
+    tfidf.sort_indices()
+    term_idx = np.repeat(np.arange(tfidf.shape[1]), np.diff(tfidf.indptr))
+    keep = tfidf.data > tfidf_threshold
+    term_data = pd.DataFrame(
+        {
+            "id": ids.values[tfidf.indices[keep]],
+            "term": feature_names[term_idx[keep]],
+            "tfidf": tfidf.data[keep],
+        }
     )
-    if tfidf_threshold is not None:
-        term_data = term_data.query(f"tfidf > {tfidf_threshold}")
-    else:
-        term_data = term_data.query("tfidf > 0")
     return term_data
 
 
@@ -297,12 +336,11 @@ def get_ns_mni_peaks_reported(
     activations = fetch_neurosynth_peak_data(
         data_dir, version, verbose, convert_study_ids
     )
-    mni_peaks = activations.loc[activations.space == "MNI"][
-        ["x", "y", "z", "id"]
-    ]
-    non_mni_peaks = activations.loc[activations.space == "TAL"][
-        ["x", "y", "z", "id"]
-    ]
+    space = activations["space"].to_numpy()
+    is_mni = space == "MNI"
+    is_tal = space == "TAL"
+    coordinates = activations[["x", "y", "z"]].to_numpy(dtype=float)
+    ids = activations["id"].to_numpy()
     proj_mat = np.linalg.pinv(
         np.array(
             [
@@ -314,21 +352,17 @@ def get_ns_mni_peaks_reported(
         ).T
     )
     projected = np.round(
-        np.dot(
-            np.hstack(
-                (
-                    non_mni_peaks[["x", "y", "z"]].values,
-                    np.ones((len(non_mni_peaks), 1)),
-                )
-            ),
-            proj_mat,
-        )[:, 0:3]
+        coordinates[is_tal] @ proj_mat[:3, :3] + proj_mat[3, :3]
     )
-    projected_df = pd.DataFrame(
-        np.hstack([projected, non_mni_peaks[["id"]].values]),
-        columns=["x", "y", "z", "id"],
+    coordinates = np.concatenate((projected, coordinates[is_mni])).astype(
+        int
     )
-    peak_data = pd.concat([projected_df, mni_peaks]).astype(
-        {"x": int, "y": int, "z": int}
+    peak_data = pd.DataFrame(
+        {
+            "x": coordinates[:, 0],
+            "y": coordinates[:, 1],
+            "z": coordinates[:, 2],
+            "id": np.concatenate((ids[is_tal], ids[is_mni])),
+        }
     )
     return peak_data
@@ -786,6 +786,7 @@ class NeuroSynthMixin:
         version: int = 7,
         convert_study_ids: bool = False,
         tfidf_threshold: Optional[float] = None,
+        terms: Optional[Iterable[str]] = None,
     ) -> fe.Symbol:
         """
         Load TF-IDF values for each (term, study) association within the
@@ -807,6 +808,9 @@ class NeuroSynthMixin:
         tfidf_threshold : Optional[float], optional
             the minimum tfidf value for the (term, study) associations,
             by default None
+        terms : Optional[Iterable[str]], optional
+            the terms for which associations are loaded, all terms in the
+            vocabulary if None, by default None
 
         Returns
         -------
@@ -821,6 +825,7 @@ class NeuroSynthMixin:
             version=version,
             convert_study_ids=convert_study_ids,
             tfidf_threshold=tfidf_threshold,
+            terms=terms,
         )
         if convert_study_ids:
             type_ = Tuple[StudyID, str, float]
@@ -4,9 +4,14 @@ from unittest.mock import patch
 
 import pandas as pd
 import pytest
+from scipy import sparse
 
 from .. import NeurolangDL
-from ..neurosynth_utils import StudyID
+from ..neurosynth_utils import (
+    StudyID,
+    get_ns_mni_peaks_reported,
+    get_ns_term_study_associations,
+)
 
 
 @pytest.fixture
@@ -129,6 +134,65 @@ def term_data(features):
     return term_data
 
 
+@patch("neurolang.frontend.neurosynth_utils._fetch_sparse_feature_data")
+def test_get_ns_term_study_associations(
+    mock_fetch_sparse_feature_data, features, term_data
+):
+    mock_fetch_sparse_feature_data.return_value = (
+        sparse.csr_matrix(features.values),
+        features.index.to_series(),
+        features.columns.tolist(),
+    )
+    data_dir = Path("mock_data_dir")
+
+    res = get_ns_term_study_associations(data_dir)
+    expected = term_data.query("tfidf > 0")
+    assert list(res.columns) == ["id", "term", "tfidf"]
+    assert list(res.itertuples(index=False, name=None)) == list(
+        expected.itertuples(index=False, name=None)
+    )
+
+    res = get_ns_term_study_associations(data_dir, tfidf_threshold=0.1)
+    expected = term_data.query("tfidf > 0.1")
+    assert list(res.itertuples(index=False, name=None)) == list(
+        expected.itertuples(index=False, name=None)
+    )
+
+    res = get_ns_term_study_associations(
+        data_dir, terms=["adhd", "stimulus response"]
+    )
+    expected = term_data.query(
+        "tfidf > 0 and term in ['adhd', 'stimulus response']"
+    )
+    assert list(res.itertuples(index=False, name=None)) == list(
+        expected.itertuples(index=False, name=None)
+    )
+
+    with pytest.raises(KeyError, match="not-a-term"):
+        get_ns_term_study_associations(
+            data_dir, terms=(t for t in ["adhd", "not-a-term"])
+        )
+
+
+@patch("neurolang.frontend.neurosynth_utils.fetch_neurosynth_peak_data")
+def test_get_ns_mni_peaks_reported(mock_fetch_peak_data, peak_data):
+    mock_fetch_peak_data.return_value = peak_data
+    data_dir = Path("mock_data_dir")
+
+    res = get_ns_mni_peaks_reported(data_dir)
+    assert list(res.columns) == ["x", "y", "z", "id"]
+    assert len(res) == len(peak_data)
+    assert all(res[c].dtype == int for c in ("x", "y", "z", "id"))
+    mni_peaks = peak_data.loc[peak_data.space == "MNI"]
+    assert set(res.iloc[-len(mni_peaks):].itertuples(index=False)) == set(
+        mni_peaks[["x", "y", "z", "id"]]
+        .astype(int)
+        .itertuples(index=False)
+    )
+    assert set(res.iloc[: -len(mni_peaks)]["id"]) == {9256495}
+    assert tuple(res.iloc[0]) == (60, 32, 1, 9256495)
+
+
 @patch("neurolang.frontend.query_resolution.fetch_study_metadata")
 def test_load_neurosynth_study_ids(mock_fetch_study_metadata, metadata):
     mock_fetch_study_metadata.return_value = metadata
@@ -204,6 +204,42 @@ def test_within_language_succ_query():
     assert_almost_equal(res, expected)
 
 
+def test_within_language_succ_queries_sharing_their_body():
+    solved_queries = []
+
+    def succ_solver(query, cpl_program):
+        solved_queries.append(query)
+        return dalvi_suciu_lift.solve_succ_query(
+            query, cpl_program
+        )
+
+    nl = NeurolangPDL(
+        probabilistic_solvers=(succ_solver,),
+        probabilistic_marg_solvers=(
+            dalvi_suciu_lift.solve_marg_query,
+        ),
+    )
+    P = nl.add_uniform_probabilistic_choice_over_set(
+        [("a", "b"), ("b", "c"), ("b", "d")], name="P"
+    )
+    Q = nl.add_uniform_probabilistic_choice_over_set(
+        [("a",), ("b",)], name="Q"
+    )
+    with nl.environment as e:
+        e.Z[e.x, e.PROB[e.x]] = P[e.x, e.y] & Q[e.x]
+        e.W[e.PROB[e.x], e.x] = P[e.x, e.y] & Q[e.x]
+        res = nl.solve_all()
+    assert len(solved_queries) == 1
+    expected = RelationalAlgebraFrozenSet(
+        [("b", 1 / 3 * 1 / 2 + 1 / 3 * 1 / 2), ("a", 1 / 3 * 1 / 2)]
+    )
+    assert_almost_equal(res["Z"], expected)
+    expected = RelationalAlgebraFrozenSet(
+        [(1 / 3 * 1 / 2 + 1 / 3 * 1 / 2, "b"), (1 / 3 * 1 / 2, "a")]
+    )
+    assert_almost_equal(res["W"], expected)
+
+
 def test_solve_query():
     nl = NeurolangPDL()
     P = nl.add_uniform_probabilistic_choice_over_set(
@@ -1,9 +1,12 @@
 import logging
+import threading
 from functools import reduce
 from itertools import chain, combinations
 from typing import AbstractSet
 
 import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
 
 from .. import relational_algebra_provenance as rap
 from ..config import config
@@ -74,6 +77,7 @@ from ..relational_algebra import (
 )
 from ..relational_algebra_provenance import ProvenanceAlgebraSet
 from ..utils import OrderedSet, log_performance
+from ..utils.various import cache_by_identity
 from .containment import is_contained
 from .expression_processing import (
     is_builtin,
@@ -117,12 +121,43 @@ __all__ = [
 ]
 
 
+ECQN = ExtractConjunctiveQueryWithNegation()
 GC = GuaranteeConjunction()
+GD = GuaranteeDisjunction()
+MEI = MakeExistentialsImplicit()
 MNTA = MoveNegationsToAtoms()
 MQU = MoveQuantifiersUp()
+MUI = MakeUniversalsImplicit()
 PQD = PushQuantifiersDown()
 RTO = RemoveTrivialOperations()
 RUP = RemoveUniversalPredicates()
+TNRA = TranslateToNamedRA()
+UVE = UnifyVariableEqualities()
+
+_LIFTING_STATE = threading.local()
+
+EMPTY_SET = frozenset()
+
+
+def _extract_logic_atoms(expression):
+    extract = getattr(_LIFTING_STATE, "extract_logic_atoms", None)
+    if extract is None:
+        return extract_logic_atoms(expression)
+    return extract(expression)
+
+
+def _extract_logic_free_variables(expression):
+    extract = getattr(_LIFTING_STATE, "extract_logic_free_variables", None)
+    if extract is None:
+        return extract_logic_free_variables(expression)
+    return extract(expression)
+
+
+def _is_contained(q1, q2):
+    contained = getattr(_LIFTING_STATE, "is_contained", None)
+    if contained is None:
+        return is_contained(q1, q2)
+    return contained(q1, q2)
 
 
 class ExtendedRAPToRAWalker(
@@ -238,7 +273,7 @@ def _prepare_and_optimise_query(flat_query, cpl_program):
         for f in flat_query_body.formulas
     )))
     flat_query = Implication(flat_query.consequent, flat_query_body)
-    unified_query = UnifyVariableEqualities().walk(flat_query)
+    unified_query = UVE.walk(flat_query)
     if config.get_probabilistic_solver_check_unate():
         _verify_that_the_query_has_one_quantifier(flat_query)
     symbol_table = generate_probabilistic_symbol_table_for_query(
@@ -269,7 +304,7 @@ def _prepare_and_optimise_query(flat_query, cpl_program):
 def _verify_that_the_query_has_no_builtins(shattered_query, cpl_program):
     if any(
         is_builtin(atom, known_builtins=cpl_program.builtins())
-        for atom in extract_logic_atoms(shattered_query)
+        for atom in _extract_logic_atoms(shattered_query)
     ):
         raise UnsupportedSolverError(
             "Builtins not allowed for Dalvi-Suciu lifting"
@@ -327,7 +362,44 @@ def dalvi_suciu_lift(rule, symbol_table):
     by the `NonLiftable` expression.
     [1] Dalvi, N. & Suciu, D. The dichotomy of probabilistic inference
     for unions of conjunctive queries. J. ACM 59, 1–87 (2012).
+
+    The recursion lifts the same subquery more than once, e.g. on
+    overlapping subsets of the inclusion-exclusion formula, hence plans,
+    as well as the atoms and free variables extracted from the formulas
+    being lifted and the containments between them, are memoised for the
+    duration of the outermost call.
     '''
+    lifted_plans = getattr(_LIFTING_STATE, "lifted_plans", None)
+    if lifted_plans is not None:
+        return _memoised_lift(rule, symbol_table, lifted_plans)
+
+    _LIFTING_STATE.lifted_plans = {}
+    _LIFTING_STATE.extract_logic_atoms = cache_by_identity(
+        extract_logic_atoms
+    )
+    _LIFTING_STATE.extract_logic_free_variables = cache_by_identity(
+        extract_logic_free_variables
+    )
+    _LIFTING_STATE.is_contained = cache_by_identity(is_contained)
+    try:
+        return _memoised_lift(
+            rule, symbol_table, _LIFTING_STATE.lifted_plans
+        )
+    finally:
+        del _LIFTING_STATE.lifted_plans
+        del _LIFTING_STATE.extract_logic_atoms
+        del _LIFTING_STATE.extract_logic_free_variables
+        del _LIFTING_STATE.is_contained
+
+
+def _memoised_lift(rule, symbol_table, lifted_plans):
+    key = (id(symbol_table), rule)
+    if key not in lifted_plans:
+        lifted_plans[key] = _dalvi_suciu_lift(rule, symbol_table)
+    return lifted_plans[key]
+
+
+def _dalvi_suciu_lift(rule, symbol_table):
     #  rule = RemoveUniversalPredicates().walk(rule)
     rule = RTO.walk(rule)
 
@@ -387,16 +459,16 @@ def symbol_or_deterministic_plan(rule, symbol_table):
     res = None
     if isinstance(rule, FunctionApplication):
         has_safe_plan = True
-        res = TranslateToNamedRA().walk(rule)
+        res = TNRA.walk(rule)
     elif (
         all(
             is_atom_a_deterministic_relation(atom, symbol_table)
-            for atom in extract_logic_atoms(rule)
+            for atom in _extract_logic_atoms(rule)
         )
     ):
-        free_vars = extract_logic_free_variables(rule)
-        rule = MakeExistentialsImplicit().walk(rule)
-        result = TranslateToNamedRA().walk(rule)
+        free_vars = _extract_logic_free_variables(rule)
+        rule = MEI.walk(rule)
+        result = TNRA.walk(rule)
         proj_cols = tuple(Constant(ColumnStr(v.name)) for v in free_vars)
         has_safe_plan = True
         res = rap.Projection(result, proj_cols)
@@ -424,12 +496,12 @@ def convert_ucq_to_ccq(rule, transformation='CNF'):
         in a connected component query.
     """
     rule = PQD.walk(RUP.walk(PQD.walk(MNTA.walk(rule))))
-    free_vars = extract_logic_free_variables(rule)
+    free_vars = _extract_logic_free_variables(rule)
     existential_vars = set()
-    for atom in extract_logic_atoms(rule):
+    for atom in _extract_logic_atoms(rule):
         existential_vars.update(set(atom.args) - set(free_vars))
 
-    conjunctions = ExtractConjunctiveQueryWithNegation().walk(rule)
+    conjunctions = ECQN.walk(rule)
     dic_components = extract_connected_components(
         conjunctions, existential_vars
     )
@@ -443,13 +515,13 @@ def convert_ucq_to_ccq(rule, transformation='CNF'):
             fresh_symbols_expression
         )
         minimize = minimize_ucq_in_cnf
-        gcd = GuaranteeConjunction()
+        gcd = GC
     elif transformation == 'DNF':
         fresh_symbols_expression = convert_to_dnf_existential_ucq(
             fresh_symbols_expression
         )
         minimize = minimize_ucq_in_dnf
-        gcd = GuaranteeDisjunction()
+        gcd = GD
     else:
         raise ValueError(f'Invalid transformation type: {transformation}')
 
@@ -457,10 +529,18 @@ def convert_ucq_to_ccq(rule, transformation='CNF'):
         {v: k for k, v in dic_components.items()}
     ).walk(fresh_symbols_expression)
 
-    try:
-        final_expression = minimize(final_expression)
-    except NotInFONegE:
-        pass
+    max_formulas = config.get_probabilistic_solver_minimize_max_formulas()
+    n_formulas = len(getattr(final_expression, 'formulas', (None,)))
+    if n_formulas <= max_formulas:
+        try:
+            final_expression = minimize(final_expression, _is_contained)
+        except NotInFONegE:
+            pass
+    else:
+        LOG.info(
+            "Skipping the minimization of a %s with %d formulas",
+            transformation, n_formulas
+        )
 
     return gcd.walk(final_expression)
 
@@ -529,7 +609,7 @@ def calc_new_fresh_symbol(formula, existential_vars):
         New symbol containing only the unbound variables of the formula.
 
     """
-    cvars = extract_logic_free_variables(formula) - existential_vars
+    cvars = _extract_logic_free_variables(formula) - existential_vars
 
     fresh_symbol = Symbol.fresh()
     new_symbol = fresh_symbol(tuple(cvars))
@@ -543,13 +623,33 @@ def symbol_connected_components(expression):
             "Connected components can only be computed "
             "for n-ary logic operators."
         )
-    c_matrix = symbol_co_occurence_graph(expression)
-    components = connected_components(c_matrix)
+    # Union-find over the formulas, where each formula is merged with
+    # the first formula sharing one of its predicate symbols. This avoids
+    # building the quadratic symbol co-occurrence graph.
+    parents = list(range(len(expression.formulas)))
+
+    def find(i):
+        while parents[i] != i:
+            parents[i] = parents[parents[i]]
+            i = parents[i]
+        return i
+
+    first_formula_with_symbol = {}
+    for i, formula in enumerate(expression.formulas):
+        for atom in _extract_logic_atoms(formula):
+            j = first_formula_with_symbol.setdefault(atom.functor, i)
+            root_i, root_j = find(i), find(j)
+            if root_i != root_j:
+                parents[max(root_i, root_j)] = min(root_i, root_j)
+
+    components = {}
+    for i, formula in enumerate(expression.formulas):
+        components.setdefault(find(i), []).append(formula)
 
     operation = type(expression)
     return [
-        operation(tuple(expression.formulas[i] for i in component))
-        for component in components
+        operation(tuple(component))
+        for component in components.values()
     ]
 
 
@@ -569,17 +669,10 @@ def symbol_co_occurence_graph(expression):
         shared predicate symbol between two subformulas of the
         logic expression.
     """
-    c_matrix = np.zeros((len(expression.formulas),) * 2)
-    for i, formula in enumerate(expression.formulas):
-        atom_symbols = set(a.functor for a in extract_logic_atoms(formula))
-        for j, formula_ in enumerate(expression.formulas[i + 1:]):
-            atom_symbols_ = set(
-                a.functor for a in extract_logic_atoms(formula_)
-            )
-            if not atom_symbols.isdisjoint(atom_symbols_):
-                c_matrix[i, i + 1 + j] = 1
-                c_matrix[i + 1 + j, i] = 1
-    return c_matrix
+    return _co_occurrence_graph([
+        set(a.functor for a in _extract_logic_atoms(formula))
+        for formula in expression.formulas
+    ])
 
 
 def args_co_occurence_graph(expression, variable_to_use=None):
@@ -600,23 +693,48 @@ def args_co_occurence_graph(expression, variable_to_use=None):
     """
 
     if isinstance(expression, Quantifier):
-        return np.ones((1,))
+        return np.ones((1,), dtype=bool)
 
-    c_matrix = np.zeros((len(expression.formulas),) * 2)
-    for i, formula in enumerate(expression.formulas):
-        f_args = set(b for a in extract_logic_atoms(formula) for b in a.args)
+    formulas_args = []
+    for formula in expression.formulas:
+        f_args = set(b for a in _extract_logic_atoms(formula) for b in a.args)
         if variable_to_use is not None:
             f_args &= variable_to_use
-        for j, formula_ in enumerate(expression.formulas[i + 1:]):
-            f_args_ = set(
-                b for a in extract_logic_atoms(formula_) for b in a.args
-            )
-            if variable_to_use is not None:
-                f_args_ &= variable_to_use
-            if not f_args.isdisjoint(f_args_):
-                c_matrix[i, i + 1 + j] = 1
-                c_matrix[i + 1 + j, i] = 1
+        formulas_args.append(f_args)
+    return _co_occurrence_graph(formulas_args)
+
+
+def _co_occurrence_graph(element_sets):
+    """Adjacency matrix of the graph linking two sets when
+    they share an element, computed as the product of the
+    set-membership matrix by its transpose.
 
+    Parameters
+    ----------
+    element_sets : list of sets
+        sets of hashable elements, one per node of the graph.
+
+    Returns
+    -------
+    numpy.ndarray
+        squared boolean array where a component is True if the
+        corresponding sets are different and share an element.
+    """
+    element_index = {}
+    rows = []
+    columns = []
+    for i, elements in enumerate(element_sets):
+        for element in elements:
+            rows.append(i)
+            columns.append(
+                element_index.setdefault(element, len(element_index))
+            )
+    membership = np.zeros(
+        (len(element_sets), len(element_index)), dtype=bool
+    )
+    membership[rows, columns] = True
+    c_matrix = membership @ membership.T
+    np.fill_diagonal(c_matrix, False)
     return c_matrix
 
 
@@ -634,20 +752,15 @@ def connected_components(adjacency_matrix):
     list of integer sets
         connected components of the graph.
     """
-    node_idxs = set(range(adjacency_matrix.shape[0]))
-    components = []
-    while node_idxs:
-        idx = node_idxs.pop()
-        component = {idx}
-        component_follow = [idx]
-        while component_follow:
-            idx = component_follow.pop()
-            idxs = set(adjacency_matrix[idx].nonzero()[0]) - component
-            component |= idxs
-            component_follow += idxs
-        components.append(component)
-        node_idxs -= component
-    return components
+    n_components, labels = csgraph.connected_components(
+        sparse.csr_matrix(adjacency_matrix), directed=False
+    )
+    node_idxs = np.argsort(labels, kind="stable")
+    splits = np.cumsum(np.bincount(labels, minlength=n_components))[:-1]
+    return [
+        set(component.tolist())
+        for component in np.split(node_idxs, splits)
+    ]
 
 
 def disjoint_project(rule_dnf, symbol_table):
@@ -688,10 +801,10 @@ def disjoint_project_conjunctive_query(conjunctive_query, symbol_table):
     all probabilistic choice variables.
 
     """
-    free_variables = extract_logic_free_variables(conjunctive_query)
+    free_variables = _extract_logic_free_variables(conjunctive_query)
     atoms_with_constants_in_all_key_positions = set(
         atom
-        for atom in extract_logic_atoms(conjunctive_query)
+        for atom in _extract_logic_atoms(conjunctive_query)
         if is_probabilistic_atom_with_constants_in_all_key_positions(
             atom, symbol_table
         )
@@ -751,16 +864,18 @@ def disjoint_project_disjunctive_query(disjunctive_query, symbol_table):
 
 
 def _get_disjuncts_containing_atom_with_all_key_attributes(ucq, symbol_table):
-    matching_disjuncts = set()
+    seen_disjuncts = set()
     for disjunct in ucq.formulas:
+        if disjunct in seen_disjuncts:
+            continue
+        seen_disjuncts.add(disjunct)
         if any(
             is_probabilistic_atom_with_constants_in_all_key_positions(
                 atom, symbol_table
             )
-            for atom in extract_logic_atoms(disjunct)
+            for atom in _extract_logic_atoms(disjunct)
         ):
-            matching_disjuncts.add(disjunct)
-    return matching_disjuncts
+            yield disjunct
 
 
 def _apply_disjoint_project_ucq_rule(
@@ -768,7 +883,7 @@ def _apply_disjoint_project_ucq_rule(
     disjunct: Conjunction,
     symbol_table: TypedSymbolTableMixin,
 ):
-    free_vars = extract_logic_free_variables(disjunctive_query)
+    free_vars = _extract_logic_free_variables(disjunctive_query)
     head = add_existentials_except(disjunct, free_vars)
     head_plan = dalvi_suciu_lift(head, symbol_table)
     if not is_pure_lifted_plan(head_plan):
@@ -872,7 +987,7 @@ def find_separator_variables(query, symbol_table):
     39th ACM SIGMOD-SIGACT-SIGAI Symposium on Principles of Database Systems
     19–31 (ACM, 2020).
     '''
-    exclude_variables = extract_logic_free_variables(query)
+    exclude_variables = _extract_logic_free_variables(query)
     query = unify_existential_variables(query)
 
     if isinstance(query, NaryLogicOperator):
@@ -881,21 +996,24 @@ def find_separator_variables(query, symbol_table):
         formulas = [query]
 
     candidates = extract_probabilistic_root_variables(formulas, symbol_table)
-    all_atoms = extract_logic_atoms(query)
+    all_atoms = _extract_logic_atoms(query)
+
+    atom_positions = {}
+    for atom in all_atoms:
+        positions = {}
+        for i, arg in enumerate(atom.args):
+            positions.setdefault(arg, set()).add(i)
+        atom_positions.setdefault(atom.functor, []).append(positions)
 
     separator_variables = set()
     for var in candidates:
-        atom_positions = {}
-        for atom in all_atoms:
-            functor = atom.functor
-            pos_ = {i for i, v in enumerate(atom.args) if v == var}
-            if any(
-                pos_.isdisjoint(pos)
-                for pos in atom_positions.setdefault(functor, [])
-            ):
-                break
-            atom_positions[functor].append(pos_)
-        else:
+        if all(
+            not positions.get(var, EMPTY_SET).isdisjoint(
+                positions_.get(var, EMPTY_SET)
+            )
+            for functor_positions in atom_positions.values()
+            for positions, positions_ in combinations(functor_positions, 2)
+        ):
             separator_variables.add(var)
 
     query = convert_to_pnf_with_dnf_matrix(query)
@@ -908,25 +1026,22 @@ def extract_probabilistic_root_variables(formulas, symbol_table):
     for formula in formulas:
         probabilistic_atoms = OrderedSet(
             atom
-            for atom in extract_logic_atoms(formula)
+            for atom in _extract_logic_atoms(formula)
             if not is_atom_a_deterministic_relation(atom, symbol_table)
         )
         if len(probabilistic_atoms) == 0:
             continue
-        root_variables = reduce(
-            lambda y, x: set(x.args) & y,
-            probabilistic_atoms[1:],
-            set(probabilistic_atoms[0].args)
-        )
-        pchoice_atoms = OrderedSet(
-            atom
-            for atom in probabilistic_atoms
-            if is_atom_a_probabilistic_choice_relation(atom, symbol_table)
+        root_variables = set(probabilistic_atoms[0].args).intersection(
+            *(atom.args for atom in probabilistic_atoms[1:])
         )
         # all variables occurring in probabilistic choices cannot occur in key
         # positions, as probabilistic choice relations have no key attribute
         # (making their respective tuples mutually exclusive)
-        nonkey_variables = set().union(*(set(a.args) for a in pchoice_atoms))
+        nonkey_variables = set().union(*(
+            atom.args
+            for atom in probabilistic_atoms
+            if is_atom_a_probabilistic_choice_relation(atom, symbol_table)
+        ))
         # variables occurring in non-key positions cannot be root variables
         # because root variables must occur in every atom in a key position
         root_variables -= nonkey_variables
@@ -934,6 +1049,8 @@ def extract_probabilistic_root_variables(formulas, symbol_table):
             candidates = root_variables
         else:
             candidates &= root_variables
+        if not candidates:
+            break
     if candidates is None:
         candidates = set()
     return candidates
@@ -954,7 +1071,7 @@ class IsPureLiftedPlan(PatternWalker):
     @add_match(BinaryRelationalAlgebraOperation)
     def binary(self, expression):
         return (
-            self.walk(expression.relation_left) &
+            self.walk(expression.relation_left) and
             self.walk(expression.relation_right)
         )
 
@@ -967,8 +1084,11 @@ class IsPureLiftedPlan(PatternWalker):
         return True
 
 
+IPLP = IsPureLiftedPlan()
+
+
 def is_pure_lifted_plan(query):
-    return IsPureLiftedPlan().walk(query)
+    return IPLP.walk(query)
 
 
 def separator_variable_plan(expression, separator_variables, symbol_table):
@@ -990,23 +1110,23 @@ def separator_variable_plan(expression, separator_variables, symbol_table):
     RelationalAlgebraOperation
         plan for the logic expression.
     """
-    variables_to_project = extract_logic_free_variables(expression)
+    variables_to_project = _extract_logic_free_variables(expression)
     if any(
         isinstance(expression, ExistentialPredicate)
         for _, expression in expression_iterator(expression)
     ):
-        make_implicit = MakeExistentialsImplicit()
+        make_implicit = MEI
         quantifier_class = ExistentialPredicate
         projection_class = rap.IndependentProjection
     else:
-        make_implicit = MakeUniversalsImplicit()
+        make_implicit = MUI
         quantifier_class = UniversalPredicate
         projection_class = rap.IndependentProjectionUniversal
 
     expression = make_implicit.walk(expression)
 
     quantified_to_add = (
-        extract_logic_free_variables(expression) -
+        _extract_logic_free_variables(expression) -
         variables_to_project -
         separator_variables
     )
@@ -1037,15 +1157,10 @@ def variable_co_occurrence_graph(expression):
         squared binary array where a component is 1 if there is a
         shared free variable between two subformulas of the logic expression.
     """
-    c_matrix = np.zeros((len(expression.formulas),) * 2)
-    for i, formula in enumerate(expression.formulas):
-        free_variables = extract_logic_free_variables(formula)
-        for j, formula_ in enumerate(expression.formulas[i + 1:]):
-            free_variables_ = extract_logic_free_variables(formula_)
-            if not free_variables.isdisjoint(free_variables_):
-                c_matrix[i, i + 1 + j] = 1
-                c_matrix[i + 1 + j, i] = 1
-    return c_matrix
+    return _co_occurrence_graph([
+        _extract_logic_free_variables(formula)
+        for formula in expression.formulas
+    ])
 
 
 def components_plan(
@@ -1149,7 +1264,7 @@ def _formulas_weights(formula_powerset):
             for i0, c0, i1, c1 in ((i, f0, j, f1), (j, f1, i, f0)):
                 if (
                     c0 not in formula_containments[i1] and
-                    is_contained(c0, c1)
+                    _is_contained(c0, c1)
                 ):
                     formula_containments[i0] |= (
                         {c1} | formula_containments[i1] - {c0}
@@ -1166,29 +1281,53 @@ def _formulas_weights(formula_powerset):
 
 def mobius_weights(formula_containments):
     _mobius_weights = {}
-    for formula in formula_containments:
-        _mobius_weights[formula] = mobius_function(
-            formula, formula_containments, _mobius_weights
-        )
+    _compute_mobius_weights(
+        formula_containments, formula_containments, _mobius_weights
+    )
     return _mobius_weights
 
 
 def mobius_function(formula, formula_containments, known_weights=None):
     if known_weights is None:
         known_weights = dict()
-    if formula in known_weights:
-        return known_weights[formula]
-    res = -1
-    for f in formula_containments[formula]:
-        weight = known_weights.setdefault(
-            f,
-            mobius_function(
-                f,
-                formula_containments, known_weights=known_weights
+    _compute_mobius_weights(
+        (formula,), formula_containments, known_weights
+    )
+    return known_weights[formula]
+
+
+def _compute_mobius_weights(formulas, formula_containments, known_weights):
+    """Fill `known_weights` with the Möbius weight of every formula in
+    `formulas` and of the formulas containing them. The containment
+    lattice is traversed in post-order with an explicit stack, such that
+    wide UCQs do not hit the recursion limit. A `ValueError` is raised
+    if the containments are cyclic, as the weights are then undefined.
+    """
+    for formula in formulas:
+        stack = [formula]
+        visiting = set()
+        while stack:
+            current = stack[-1]
+            if current in known_weights:
+                stack.pop()
+                continue
+            missing = [
+                f for f in formula_containments[current]
+                if f not in known_weights
+            ]
+            if missing:
+                if any(f in visiting or f == current for f in missing):
+                    raise ValueError(
+                        f"Cyclic formula containment involving {current}"
+                    )
+                visiting.add(current)
+                stack += missing
+                continue
+            known_weights[current] = 1 - sum(
+                known_weights[f] for f in formula_containments[current]
             )
-        )
-        res += weight
-    return -res
+            visiting.discard(current)
+            stack.pop()
 
 
 def powerset(iterable):
@@ -1211,12 +1350,10 @@ def is_probabilistic_atom_with_constants_in_all_key_positions(
     be validated.
 
     """
-    return is_atom_a_probabilistic_choice_relation(atom, symbol_table) or (
-        not is_atom_a_deterministic_relation(atom, symbol_table)
-        and (
-            isinstance(atom.functor, Symbol)
-            and atom.functor in symbol_table
-            and isinstance(symbol_table[atom.functor], ProbabilisticFactSet)
-            and all(isinstance(arg, Constant) for arg in atom.args)
-        )
-    )
+    functor = atom.functor
+    return (
+        all(isinstance(arg, Constant) for arg in atom.args)
+        and isinstance(functor, Symbol)
+        and functor in symbol_table
+        and isinstance(symbol_table[functor], ProbabilisticFactSet)
+    ) or is_atom_a_probabilistic_choice_relation(atom, symbol_table)
@@ -157,8 +157,7 @@ def is_atom_a_deterministic_relation(
         True if the Expression is a relational algebra expression
         containing a single deterministic relation.
     """
-    gpsa = GetProbabilisticSetAtom(symbol_table)
-    relation = gpsa.walk(atom.functor)
+    relation = _get_probabilistic_set_atom(atom, symbol_table)
     return (
         isinstance(relation, DeterministicFactSet)
     )
@@ -183,8 +182,7 @@ def is_atom_a_probabilistic_fact_relation(
         True if the Expression is a relational algebra expression
         containing a single independent fact set relation.
     """
-    gpsa = GetProbabilisticSetAtom(symbol_table)
-    relation = gpsa.walk(atom.functor)
+    relation = _get_probabilistic_set_atom(atom, symbol_table)
     return (
         isinstance(relation, ProbabilisticFactSet)
     )
@@ -209,8 +207,34 @@ def is_atom_a_probabilistic_choice_relation(
         True if the Expression is a relational algebra expression
         containing a single choice relation.
     """
-    gpsa = GetProbabilisticSetAtom(symbol_table)
-    relation = gpsa.walk(atom.functor)
+    relation = _get_probabilistic_set_atom(atom, symbol_table)
     return (
         isinstance(relation, ProbabilisticChoiceSet)
     )
+
+
+def _get_probabilistic_set_atom(atom, symbol_table):
+    """Resolve the relation of an atom's functor as
+    `GetProbabilisticSetAtom` does, without building and dispatching
+    a walker on each of the many calls made while lifting a query.
+    """
+    relation = atom.functor
+    while True:
+        if isinstance(relation, Symbol):
+            if relation not in symbol_table:
+                return relation
+            relation = symbol_table[relation]
+        elif (
+            isinstance(relation, UnaryRelationalAlgebraOperation) and
+            not isinstance(
+                relation,
+                (
+                    DeterministicFactSet,
+                    ProbabilisticFactSet,
+                    ProbabilisticChoiceSet
+                )
+            )
+        ):
+            relation = relation.relation
+        else:
+            return relation
@@ -178,12 +178,21 @@ def _solve_within_language_prob_query(
     rule: Implication,
     succ_prob_solver: typing.Callable,
     marg_prob_solver: typing.Callable,
+    solved_queries: typing.Optional[typing.Dict] = None,
 ) -> Constant[AbstractSet]:
     query = within_language_succ_query_to_intensional_rule(rule)
-    if isinstance(rule.antecedent, Condition):
-        provset = marg_prob_solver(query, cpl)
+    # queries only differing by the name of their head predicate
+    # share the same provenance set
+    query_key = (query.consequent.args, query.antecedent)
+    if solved_queries is not None and query_key in solved_queries:
+        provset = solved_queries[query_key]
     else:
-        provset = succ_prob_solver(query, cpl)
+        if isinstance(rule.antecedent, Condition):
+            provset = marg_prob_solver(query, cpl)
+        else:
+            provset = succ_prob_solver(query, cpl)
+        if solved_queries is not None:
+            solved_queries[query_key] = provset
     relation = construct_within_language_succ_result(provset, rule)
     return relation
 
@@ -214,10 +223,11 @@ def compute_probabilistic_solution(
         prob_idb,
         check_qbased_pfact_tuple_unicity,
     )
+    solved_queries = dict()
     for rule in prob_idb.formulas:
         if is_within_language_prob_query(rule):
             relation = _solve_within_language_prob_query(
-                cpl, rule, succ_prob_solver, marg_prob_solver
+                cpl, rule, succ_prob_solver, marg_prob_solver, solved_queries
             )
             solution[rule.consequent.functor] = Constant[AbstractSet](
                 relation.value.to_unnamed()
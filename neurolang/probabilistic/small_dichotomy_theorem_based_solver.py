@@ -30,13 +30,19 @@ from ..datalog.expression_processing import (
     extract_logic_free_variables,
     extract_logic_predicates,
     flatten_query,
-    remove_conjunction_duplicates
 )
 from ..datalog.translate_to_named_ra import TranslateToNamedRA
 from ..exceptions import UnsupportedSolverError
 from ..expression_walker import ReplaceExpressionWalker
 from ..expressions import Constant, Symbol
-from ..logic import FALSE, Conjunction, Disjunction, Implication, Negation
+from ..logic import (
+    FALSE,
+    Conjunction,
+    Disjunction,
+    ExistentialPredicate,
+    Implication,
+    Negation,
+)
 from ..logic.transformations import (
     GuaranteeConjunction,
     MakeExistentialsImplicit,
@@ -50,7 +56,6 @@ from ..relational_algebra import (
 )
 from ..relational_algebra_provenance import ProvenanceAlgebraSet
 from ..utils import log_performance
-from ..utils.orderedset import OrderedSet
 from .exceptions import NotHierarchicalQueryException
 from .expression_processing import lift_optimization_for_choice_predicates
 from .probabilistic_ra_utils import (
@@ -80,46 +85,97 @@ def is_hierarchical_without_self_joins(query):
     if isinstance(antecedent, Disjunction):
         return False
 
-    has_self_joins, atom_set = extract_atom_sets_and_detect_self_joins(query)
-    has_negative_atoms = any(
-        isinstance(predicate, Negation)
-        for predicate in extract_logic_predicates(query)
+    return _is_conjunction_hierarchical_without_self_joins(
+        tuple(extract_logic_predicates(query))
     )
 
-    if has_self_joins or has_negative_atoms:
+
+def _is_conjunction_hierarchical_without_self_joins(predicates):
+    """
+    Hierarchy check on the conjunction of a tuple of unique predicates.
+    """
+    if any(isinstance(predicate, Negation) for predicate in predicates):
+        return False
+
+    # without negations, the predicates of the query are its atoms
+    has_self_joins, atom_bits = _extract_atom_bits_and_detect_self_joins(
+        predicates
+    )
+    if has_self_joins:
         return False
 
-    variables = list(atom_set)
-    for i, v in enumerate(variables):
-        at_v = atom_set[v]
-        for v2 in variables[i + 1:]:
-            at_v2 = atom_set[v2]
-            if not (at_v <= at_v2 or at_v2 <= at_v or at_v.isdisjoint(at_v2)):
-                LOG.info(
-                    "Not hierarchical on variables %s %s", v.name, v2.name
-                )
-                return False
+    return _atom_sets_are_laminar(atom_bits)
+
+
+def _atom_sets_are_laminar(atom_bits):
+    """
+    Check that the atom sets of the variables, encoded as bitmasks, are
+    pairwise nested or disjoint. Distinct atom sets are inserted by
+    decreasing size in a forest where the children of a node are
+    disjoint subsets of it. Each set must then be contained in, or
+    disjoint from, every node on its way down the forest, which avoids
+    comparing all pairs of variables.
+    """
+    variables_by_atoms = {}
+    for variable, atoms in atom_bits.items():
+        variables_by_atoms.setdefault(atoms, variable)
+
+    forest = []
+    for atoms in sorted(
+        variables_by_atoms, key=lambda bits: bin(bits).count("1"),
+        reverse=True
+    ):
+        level = forest
+        while level is not None:
+            for node_atoms, node_children in level:
+                shared_atoms = atoms & node_atoms
+                if shared_atoms == atoms:
+                    level = node_children
+                    break
+                if shared_atoms:
+                    LOG.info(
+                        "Not hierarchical on variables %s %s",
+                        variables_by_atoms[atoms].name,
+                        variables_by_atoms[node_atoms].name
+                    )
+                    return False
+            else:
+                level.append((atoms, []))
+                level = None
 
     return True
 
 
 def extract_atom_sets_and_detect_self_joins(query):
-    has_self_joins = False
-    predicates = extract_logic_atoms(query)
-    predicates = set(pred for pred in predicates if not pred.functor == EQ)
-    seen_predicate_functor = set()
-    atom_set = defaultdict(set)
-    for predicate in predicates:
+    """
+    Compute, for each variable x of the query, the set at(x) of the
+    functors of the atoms containing x. Each set is encoded as an
+    integer bitmask where the bit of a functor is given by its order of
+    appearance in the query. The extraction stops at the first self join,
+    in which case no atom sets are returned.
+    """
+    return _extract_atom_bits_and_detect_self_joins(
+        extract_logic_atoms(query)
+    )
+
+
+def _extract_atom_bits_and_detect_self_joins(atoms):
+    functor_bits = dict()
+    atom_bits = defaultdict(int)
+    for predicate in atoms:
         functor = predicate.functor
-        if functor in seen_predicate_functor:
+        if functor == EQ:
+            continue
+        if functor in functor_bits:
             LOG.info("Not hierarchical self join on variables %s", functor)
-            has_self_joins = True
-        seen_predicate_functor.add(functor)
+            return True, None
+        bit = 1 << len(functor_bits)
+        functor_bits[functor] = bit
         for variable in predicate.args:
             if not isinstance(variable, Symbol):
                 continue
-            atom_set[variable].add(functor)
-    return has_self_joins, atom_set
+            atom_bits[variable] |= bit
+    return False, atom_bits
 
 
 def solve_succ_query(query, cpl_program, run_relational_algebra_solver=True):
@@ -168,9 +224,6 @@ def solve_succ_query(query, cpl_program, run_relational_algebra_solver=True):
             str2columnstr_constant("_p_"),
         )
 
-    if isinstance(flat_query_body, Conjunction):
-        flat_query_body = remove_conjunction_duplicates(flat_query_body)
-
     with log_performance(LOG, "Translation and lifted optimisation"):
         flat_query_body = GuaranteeConjunction().walk(
             lift_optimization_for_choice_predicates(
@@ -184,21 +237,17 @@ def solve_succ_query(query, cpl_program, run_relational_algebra_solver=True):
         )
         unified_query = UnifyVariableEqualities().walk(flat_query)
         _verify_fact_and_choice_e_quantification(symbol_table, unified_query)
+        if _has_disjunctive_normal_form(unified_query.antecedent):
+            raise UnsupportedSolverError("Query not conjunctive")
         original_symbols = set(symbol_table)
         shattered_query_antecedent = shatter_constants(
             unified_query.antecedent, symbol_table
         )
         shattered_symbols = set(symbol_table) - original_symbols
 
-        shattered_query_antecedent = convert_to_pnf_with_dnf_matrix(
+        shattered_query_antecedent = _verify_that_the_query_is_conjunctive(
             shattered_query_antecedent
         )
-        shattered_query_antecedent = (
-            RemoveTrivialOperations()
-            .walk(MakeExistentialsImplicit().walk(shattered_query_antecedent))
-        )
-        if isinstance(shattered_query_antecedent, Disjunction):
-            raise UnsupportedSolverError("Query not conjunctive")
 
         shattered_query = Implication(
             unified_query.consequent,
@@ -209,15 +258,15 @@ def solve_succ_query(query, cpl_program, run_relational_algebra_solver=True):
                 shattered_query,
                 symbol_table
             )
-        shattered_query_probabilistic_body = Conjunction(
+        # the shattered antecedent is a conjunction of literals without
+        # quantifiers, hence its probabilistic predicates can be checked
+        # directly
+        if not _is_conjunction_hierarchical_without_self_joins(
             tuple(probabilistic_predicates)
-        )
-        if not is_hierarchical_without_self_joins(
-            shattered_query_probabilistic_body
         ):
             LOG.info(
                 "Query with conjunctions %s not hierarchical",
-                shattered_query_probabilistic_body.formulas,
+                probabilistic_predicates,
             )
             raise NotHierarchicalQueryException(
                 "Query not hierarchical, algorithm can't be applied"
@@ -246,24 +295,59 @@ def solve_succ_query(query, cpl_program, run_relational_algebra_solver=True):
     return prob_set_result
 
 
+def _has_disjunctive_normal_form(formula):
+    """
+    Syntactically check whether the prenex normal form of the formula
+    has a disjunctive matrix, from the disjunctions it has outside of
+    negations and universal quantifiers. This lets disjunctive queries
+    be handed over to the next solver without being shattered.
+    """
+    if isinstance(formula, Disjunction):
+        return (
+            len(formula.formulas) > 1 or
+            _has_disjunctive_normal_form(formula.formulas[0])
+        )
+    elif isinstance(formula, Conjunction):
+        return any(
+            _has_disjunctive_normal_form(conjunct)
+            for conjunct in formula.formulas
+        )
+    elif isinstance(formula, ExistentialPredicate):
+        return _has_disjunctive_normal_form(formula.body)
+    return False
+
+
+def _verify_that_the_query_is_conjunctive(antecedent):
+    """
+    Return the matrix of the prenex normal form of the antecedent,
+    raising an `UnsupportedSolverError` if it is not conjunctive.
+    """
+    antecedent = convert_to_pnf_with_dnf_matrix(antecedent)
+    antecedent = (
+        RemoveTrivialOperations()
+        .walk(MakeExistentialsImplicit().walk(antecedent))
+    )
+    if isinstance(antecedent, Disjunction):
+        raise UnsupportedSolverError("Query not conjunctive")
+    return antecedent
+
+
 def _verify_fact_and_choice_e_quantification(symbol_table, shattered_query):
     e_vars = (
         extract_logic_free_variables(shattered_query.antecedent) -
         extract_logic_free_variables(shattered_query.consequent)
     )
-    e_vars_choice = {
-        var for var in e_vars
-        if any(
-            var in set(atom.args)
-            for atom in extract_logic_atoms(shattered_query.antecedent)
-            if is_atom_a_probabilistic_choice_relation(atom, symbol_table)
-        )
-    }
+    atoms = extract_logic_atoms(shattered_query.antecedent)
+    choice_args = set()
+    for atom in atoms:
+        if is_atom_a_probabilistic_choice_relation(atom, symbol_table):
+            choice_args.update(atom.args)
+    e_vars_choice = {var for var in e_vars if var in choice_args}
     if any(
         (e_vars & atom.args) and
         is_atom_a_probabilistic_fact_relation(atom, symbol_table) and
         (e_vars & atom.args) > e_vars_choice
-        for atom in extract_logic_atoms(shattered_query.antecedent)
+        for atom in atoms
     ):
         raise UnsupportedSolverError(
                 "Cannot solve queries with existentially quantified variable "
@@ -288,12 +372,13 @@ def _extract_antecedent_probabilistic_predicates(datalog_rule, symbol_table):
 
 
 def _project_on_query_head(provset, query):
+    head_variable_names = dict.fromkeys(
+        arg.name
+        for arg in query.consequent.args
+        if isinstance(arg, Symbol)
+    )
     proj_cols = tuple(
-        OrderedSet(
-            str2columnstr_constant(arg.name)
-            for arg in query.consequent.args
-            if isinstance(arg, Symbol)
-        )
+        str2columnstr_constant(name) for name in head_variable_names
     )
     return Projection(provset, proj_cols)
 
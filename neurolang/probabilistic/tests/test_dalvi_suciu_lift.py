@@ -138,6 +138,40 @@ def test_lifted_join():
     assert res
 
 
+def test_lifted_subqueries_are_memoised(monkeypatch):
+    Q = Symbol('Q')
+    R = Symbol('R')
+    S = Symbol('S')
+    T = Symbol('T')
+    x1 = Symbol('x1')
+    x2 = Symbol('x2')
+    z = Symbol('z')
+
+    lifted_subqueries = []
+    lift = dalvi_suciu_lift._dalvi_suciu_lift
+
+    def spy_lift(rule, symbol_table):
+        lifted_subqueries.append(rule)
+        return lift(rule, symbol_table)
+
+    monkeypatch.setattr(dalvi_suciu_lift, "_dalvi_suciu_lift", spy_lift)
+    cq = Implication(Q(z), Conjunction((R(x1, z), S(x1, x2), T(x1, z))))
+    ucq = convert_rule_to_ucq(cq)
+    plan = dalvi_suciu_lift.dalvi_suciu_lift(ucq, {})
+
+    assert len(lifted_subqueries) == len(set(lifted_subqueries))
+    assert not hasattr(dalvi_suciu_lift._LIFTING_STATE, "lifted_plans")
+    assert not hasattr(
+        dalvi_suciu_lift._LIFTING_STATE, "extract_logic_atoms"
+    )
+    assert not hasattr(
+        dalvi_suciu_lift._LIFTING_STATE, "extract_logic_free_variables"
+    )
+    assert not hasattr(dalvi_suciu_lift._LIFTING_STATE, "is_contained")
+    assert dalvi_suciu_lift.dalvi_suciu_lift(ucq, {}) == plan
+    assert len(lifted_subqueries) > 1
+
+
 def test_another_liftable_join():
     Q = Symbol('Q')
     R = Symbol('R')
@@ -405,6 +439,28 @@ def test_example_4_6_a_really_simple_query():
     assert dalvi_suciu_lift.is_pure_lifted_plan(resulting_plan)
 
 
+def test_minimization_is_skipped_beyond_budget(monkeypatch):
+    def minimize(query, containment_op):
+        raise AssertionError("The query should not be minimized")
+
+    monkeypatch.setattr(dalvi_suciu_lift, "minimize_ucq_in_cnf", minimize)
+    monkeypatch.setattr(dalvi_suciu_lift, "minimize_ucq_in_dnf", minimize)
+    monkeypatch.setattr(
+        dalvi_suciu_lift.config,
+        "get_probabilistic_solver_minimize_max_formulas",
+        lambda: 0
+    )
+    R = Symbol("R")
+    S = Symbol("S")
+    x = Symbol("x")
+    y = Symbol("y")
+    query = ExistentialPredicate(
+        x, Conjunction((R(x), ExistentialPredicate(y, S(x, y))))
+    )
+    resulting_plan = dalvi_suciu_lift.dalvi_suciu_lift(query, {})
+    assert dalvi_suciu_lift.is_pure_lifted_plan(resulting_plan)
+
+
 def test_example_4_7_a_query_with_self_joins():
     R = Symbol("R")
     S = Symbol("S")
@@ -838,3 +894,24 @@ def test_interaction_deterministic_probfact_probchoice_safe():
     )
     plan = dalvi_suciu_lift.dalvi_suciu_lift(query, symbol_table)
     assert dalvi_suciu_lift.is_pure_lifted_plan(plan)
+
+
+def test_mobius_weights_of_cyclic_containments():
+    with pytest.raises(ValueError):
+        dalvi_suciu_lift.mobius_weights({0: {0}})
+    with pytest.raises(ValueError):
+        dalvi_suciu_lift.mobius_weights({0: {1}, 1: {2}, 2: {0}})
+    with pytest.raises(ValueError):
+        dalvi_suciu_lift.mobius_function(0, {0: {1, 2}, 1: {2}, 2: {1}})
+
+
+def test_mobius_weights_of_a_deep_lattice():
+    depth = 5000
+    formula_containments = {i: {i + 1} for i in range(depth)}
+    formula_containments[depth] = set()
+
+    weights = dalvi_suciu_lift.mobius_weights(formula_containments)
+    assert weights == {i: (depth - i + 1) % 2 for i in range(depth + 1)}
+    assert dalvi_suciu_lift.mobius_function(0, formula_containments) == (
+        (depth + 1) % 2
+    )
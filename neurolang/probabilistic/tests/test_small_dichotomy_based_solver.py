@@ -1,9 +1,22 @@
 import typing
 
+import pytest
+
 from ...datalog.expression_processing import EQ
 from ...expressions import Constant, Symbol
-from ...logic import Conjunction
+from ...exceptions import UnsupportedSolverError
+from ...logic import (
+    Conjunction,
+    Disjunction,
+    ExistentialPredicate,
+    Implication,
+    Negation,
+)
+from .. import small_dichotomy_theorem_based_solver
+from ..cplogic.program import CPLogicProgram
 from ..small_dichotomy_theorem_based_solver import (
+    _has_disjunctive_normal_form,
+    _verify_that_the_query_is_conjunctive,
     is_hierarchical_without_self_joins,
 )
 
@@ -50,3 +63,48 @@ def test_non_hierarchical_builtin():
     )
     q = Conjunction((Q(x), R(y), some_builtin(y, z), some_builtin(x, w)))
     assert not is_hierarchical_without_self_joins(q)
+
+
+def test_query_not_conjunctive():
+    q = Conjunction((Q(x), R(x, y)))
+    assert _verify_that_the_query_is_conjunctive(q) == q
+    with pytest.raises(UnsupportedSolverError):
+        _verify_that_the_query_is_conjunctive(
+            Conjunction((Q(x), Disjunction((R(x, y), T(x)))))
+        )
+
+
+def test_disjunctive_query_is_not_shattered(monkeypatch):
+    def shatter_constants(*args, **kwargs):
+        raise AssertionError("the query should not be shattered")
+
+    monkeypatch.setattr(
+        small_dichotomy_theorem_based_solver,
+        "shatter_constants",
+        shatter_constants,
+    )
+    cpl_program = CPLogicProgram()
+    cpl_program.add_probabilistic_facts_from_tuples(
+        Q, [(0.2, "a"), (0.7, "b")]
+    )
+    cpl_program.add_probabilistic_facts_from_tuples(R, [(0.5, "a")])
+    cpl_program.walk(Implication(T(x), Q(x)))
+    cpl_program.walk(Implication(T(x), R(x)))
+    query = Implication(Symbol("ans")(x), T(x))
+    with pytest.raises(UnsupportedSolverError):
+        small_dichotomy_theorem_based_solver.solve_succ_query(
+            query, cpl_program
+        )
+
+
+def test_has_disjunctive_normal_form():
+    assert not _has_disjunctive_normal_form(Conjunction((Q(x), R(x, y))))
+    assert _has_disjunctive_normal_form(
+        Conjunction((Q(x), ExistentialPredicate(
+            y, Disjunction((R(x, y), T(y)))
+        )))
+    )
+    assert not _has_disjunctive_normal_form(
+        Conjunction((Q(x), Negation(Disjunction((R(x, y), T(y))))))
+    )
+    assert not _has_disjunctive_normal_form(Disjunction((Q(x),)))
@@ -31,12 +31,11 @@ LOG = logging.getLogger(__name__)
 
 GC = GuaranteeConjunction()
 GD = GuaranteeDisjunction()
-MNA = MoveNegationsToAtomsInFONegE()
 PED = PushExistentialsDown()
 RTO = RemoveTrivialOperations()
 
 
-def minimize_ucq_in_cnf(query):
+def minimize_ucq_in_cnf(query, containment_op=is_contained):
     """Convert UCQ to CNF form
     and minimise.
 
@@ -45,6 +44,9 @@ def minimize_ucq_in_cnf(query):
     query : LogicExpression.
         query in UCQ semantics.
 
+    containment_op : callable, optional
+        containment check between two queries, by default `is_contained`.
+
     Returns
     -------
     LogicExpression
@@ -53,7 +55,7 @@ def minimize_ucq_in_cnf(query):
     query = convert_to_cnf_existential_ucq(query)
     head_variables = extract_logic_free_variables(query)
     cq_d_min = Conjunction(tuple(
-        minimize_component_disjunction(c, head_variables)
+        minimize_component_disjunction(c, head_variables, containment_op)
         for c in query.formulas
     ))
 
@@ -65,12 +67,14 @@ def minimize_ucq_in_cnf(query):
         GuaranteeConjunction,
     )
 
-    cq_min = minimize_component_conjunction(cq_d_min, head_variables)
+    cq_min = minimize_component_conjunction(
+        cq_d_min, head_variables, containment_op
+    )
     cq_min = add_existentials_except(cq_min, head_variables)
     return simplify.walk(cq_min)
 
 
-def minimize_ucq_in_dnf(query):
+def minimize_ucq_in_dnf(query, containment_op=is_contained):
     """Convert UCQ to DNF form
     and minimise.
 
@@ -79,6 +83,9 @@ def minimize_ucq_in_dnf(query):
     query : LogicExpression.
         query in UCQ semantics.
 
+    containment_op : callable, optional
+        containment check between two queries, by default `is_contained`.
+
     Returns
     -------
     LogicExpression
@@ -87,7 +94,7 @@ def minimize_ucq_in_dnf(query):
     query = convert_to_dnf_existential_ucq(query)
     head_variables = extract_logic_free_variables(query)
     cq_d_min = Disjunction(tuple(
-        minimize_component_conjunction(c, head_variables)
+        minimize_component_conjunction(c, head_variables, containment_op)
         for c in query.formulas
     ))
 
@@ -99,7 +106,9 @@ def minimize_ucq_in_dnf(query):
         GuaranteeDisjunction
     )
 
-    cq_min = minimize_component_disjunction(cq_d_min, head_variables)
+    cq_min = minimize_component_disjunction(
+        cq_d_min, head_variables, containment_op
+    )
     cq_min = add_existentials_except(cq_min, head_variables)
     return simplify.walk(cq_min)
 
@@ -186,7 +195,9 @@ def convert_to_dnf_existential_ucq(expression):
     return c.walk(expression)
 
 
-def minimize_component_disjunction(disjunction, head_vars=None):
+def minimize_component_disjunction(
+    disjunction, head_vars=None, containment_op=is_contained
+):
     """Given a disjunction of queries Q1  ∨ ... ∨ Qn
     remove each query Qi such that exists Qj and
     Qi → Qj.
@@ -199,6 +210,9 @@ def minimize_component_disjunction(disjunction, head_vars=None):
     head_vars: set
         variables to be considered as constants
 
+    containment_op : callable, optional
+        containment check between two queries, by default `is_contained`.
+
     Returns
     -------
     Disjunction
@@ -214,14 +228,16 @@ def minimize_component_disjunction(disjunction, head_vars=None):
         split_positive_negative_formulas(disjunction)
     keep = minimise_formulas_containment(
         positive_formulas,
-        is_contained,
+        containment_op,
         head_vars
     ) + tuple(negative_formulas)
 
     return GD.walk(RTO.walk(Disjunction(keep)))
 
 
-def minimize_component_conjunction(conjunction, head_vars=None):
+def minimize_component_conjunction(
+    conjunction, head_vars=None, containment_op=is_contained
+):
     """Given a conjunction of queries Q1 ∧ ... ∧ Qn
     remove each query Qi such that exists Qj and
     Qj → Qi.
@@ -234,6 +250,9 @@ def minimize_component_conjunction(conjunction, head_vars=None):
     head_vars: set
         variables to be considered as constants
 
+    containment_op : callable, optional
+        containment check between two queries, by default `is_contained`.
+
     Returns
     -------
     Conjunction
@@ -251,7 +270,7 @@ def minimize_component_conjunction(conjunction, head_vars=None):
         split_positive_negative_formulas(conjunction)
     keep = minimise_formulas_containment(
         positive_formulas,
-        lambda x, y: is_contained(y, x),
+        lambda x, y: containment_op(y, x),
         head_vars
     ) + tuple(negative_formulas)
 
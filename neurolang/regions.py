@@ -11,7 +11,8 @@ __all__ = [
     'region_set_from_masked_data', 'take_principal_regions',
     'Region', 'VolumetricBrainRegion', 'PointSet',
     'ImplicitVBR', 'ExplicitVBR', 'ExplicitVBROverlay',
-    'SphericalVolume', 'PlanarVolume'
+    'SphericalVolume', 'PlanarVolume',
+    'resampled_affine_and_shape', 'world_to_voxel'
 ]
 
 
@@ -277,12 +278,14 @@ class ExplicitVBR(VolumetricBrainRegion):
             ar.setflags(write=False)
         self.image_dim = image_dim
         self._aabb_tree = None
-        self._bounding_box = self.generate_bounding_box(self.voxels)
+        self._bounding_box = None
         if prebuild_tree:
             self.build_tree()
 
     @property
     def bounding_box(self):
+        if self._bounding_box is None:
+            self._bounding_box = self.generate_bounding_box(self.voxels)
         return self._bounding_box
 
     @property
@@ -298,7 +301,7 @@ class ExplicitVBR(VolumetricBrainRegion):
         return aabb_from_vertices(voxels_xyz)
 
     def build_tree(self):
-        box = self._bounding_box
+        box = self.bounding_box
         tree = Tree()
         tree.add(box)
 
@@ -486,6 +489,62 @@ def take_principal_regions(region_set, k):
     return set(sorted_by_size[:k])
 
 
+def resampled_affine_and_shape(img, voxel_size):
+    """Compute the affine and the shape of an image resampled to
+    isotropic voxels, as ``nilearn.image.resample_img`` would, from its
+    header only, without loading nor interpolating the volume. This
+    suffices when the resampled image only serves as a voxel grid, e.g.
+    to map world coordinates to voxels.
+
+    Parameters
+    ----------
+    img : nibabel image
+        image to resample.
+    voxel_size : float
+        size of the resampled voxels, in world units.
+
+    Returns
+    -------
+    tuple of numpy.ndarray and tuple of int
+        diagonal affine and shape of the resampled image.
+    """
+    target_affine = np.diag([float(voxel_size)] * 3 + [1.0])
+    corners = np.array(
+        list(product(*((0, n - 1) for n in img.shape[:3])))
+    )
+    bounds = nib.affines.apply_affine(
+        np.linalg.inv(target_affine) @ img.affine, corners
+    )
+    lower = bounds.min(axis=0)
+    target_affine[:3, 3] = voxel_size * lower
+    shape = tuple(int(s) + 1 for s in np.ceil(bounds.max(axis=0) - lower))
+    return target_affine, shape
+
+
+def world_to_voxel(xyz, affine):
+    """Map world coordinates to the nearest voxels of a diagonal affine,
+    such as the one of `resampled_affine_and_shape`.
+
+    The inverse of a diagonal affine amounts to shifting by its origin and
+    scaling by the inverse voxel size, which is computed in float32.
+
+    Parameters
+    ----------
+    xyz : numpy.ndarray
+        N x 3 array of world coordinates.
+    affine : numpy.ndarray
+        diagonal affine of the voxel grid.
+
+    Returns
+    -------
+    numpy.ndarray
+        N x 3 array of int32 voxel indices.
+    """
+    origin = affine[:3, 3].astype(np.float32)
+    scale = (1 / np.diag(affine)[:3]).astype(np.float32)
+    return np.rint((xyz - origin) * scale).astype(np.int32)
+
+
 class ImplicitVBR(VolumetricBrainRegion):
     def __contains__(self, voxel):
         raise NotImplementedError()
@@ -4,7 +4,7 @@ import typing
 from .. import expressions
 from ..expression_pattern_matching import (
     PatternMatcher, add_match, NeuroLangPatternMatchingNoMatch,
-    UndeterminedType
+    UndeterminedType, _patterns_for_expression_class
 )
 from ..expressions import Projection, Statement, Query
 
@@ -211,3 +211,33 @@ def test_pattern_matching_wrong_args():
             )
             def __(self, expression):
                 return expression
+
+
+def test_patterns_filtered_by_expression_class():
+    class PM(PatternMatcher):
+        @add_match(S_)
+        def symbol(self, expression):
+            return expression
+
+        @add_match(C_[str])
+        def string(self, expression):
+            return expression
+
+        @add_match(F_(C_, ...))
+        def application(self, expression):
+            return expression
+
+        @add_match(...)
+        def anything(self, expression):
+            return expression
+
+    patterns = _patterns_for_expression_class(PM, C_[int])
+    assert [action for _, _, action in patterns] == [
+        PM.string, PM.anything
+    ]
+    patterns = _patterns_for_expression_class(PM, tuple)
+    assert [action for _, _, action in patterns] == [PM.anything]
+
+    pm = PM()
+    assert pm.match(C_[int](1)) == C_[int](1)
+    assert pm.match(example_expressions['f_d']) is example_expressions['f_d']
@@ -13,7 +13,8 @@ from ..CD_relations import (cardinal_relation,
 from ..exceptions import NeuroLangException
 from ..regions import (ExplicitVBR, ExplicitVBROverlay, PlanarVolume, Region,
                        SphericalVolume, region_difference, region_intersection,
-                       region_union)
+                       region_union, resampled_affine_and_shape,
+                       world_to_voxel)
 
 
 def _generate_random_box(size_bounds, *args):
@@ -609,3 +610,29 @@ def test_destrieux_cardinal_directions_inferior(destrieux):
         r = destrieux[n]
         assert cardinal_relation(r, r34, "I", refine_overlapping=True), n
         assert not cardinal_relation(r, r34, "S", refine_overlapping=True), n
+
+
+def test_resampled_affine_and_shape():
+    from nilearn.image import resample_img
+
+    affine = np.array([
+        [-2., 0, 0, 90],
+        [0, 2, 0, -126],
+        [0, 0, 2, -72],
+        [0, 0, 0, 1],
+    ])
+    img = nib.Nifti1Image(np.zeros((91, 109, 91), dtype=np.float32), affine)
+    target_affine, shape = resampled_affine_and_shape(img, 4)
+    resampled = resample_img(img, np.eye(3) * 4, interpolation="nearest")
+    assert np.allclose(target_affine, resampled.affine)
+    assert shape == resampled.shape
+
+
+def test_world_to_voxel():
+    affine = np.diag([4., 4., 4., 1.])
+    affine[:3, 3] = (-90, -126, -72)
+    xyz = np.array([[-90., -126., -72.], [0., 0., 0.], [10., -3., 5.]])
+    expected = np.rint(
+        nib.affines.apply_affine(np.linalg.inv(affine), xyz)
+    ).astype(int)
+    assert np.array_equal(world_to_voxel(xyz, affine), expected)
@@ -17,6 +17,7 @@ from typing_inspect import (get_origin, is_callable_type, is_generic_type,
                             is_tuple_type, is_typevar, is_union_type)
 
 from ..exceptions import NeuroLangException
+from ..utils.various import cache_by_identity
 
 NEW_TYPING = sys.version_info[:3] >= (3, 7, 0)
 
@@ -108,6 +109,10 @@ def is_consistent(type1, type2):
         return type1 is type2
 
 
+# Types from the typing module can be equal without being equivalent,
+# e.g. Set == Set[T] although only Set is parametrical, hence the type
+# predicates are memoised on the identity of their arguments.
+@cache_by_identity
 def is_leq_informative(left, right):
     if not (is_type(left) and is_type(right)):
         raise ValueError('Both parameters need to be types')
@@ -201,6 +206,7 @@ def is_type(type_):
     )
 
 
+@cache_by_identity
 def is_parametrical(type_):
     is_parametrical_generic = any(
         p(type_)
@@ -219,6 +225,7 @@ def is_parametrical(type_):
         return False
 
 
+@cache_by_identity
 def is_parameterized(type_):
     is_parametrical_generic = any(
         p(type_)
@@ -454,6 +461,7 @@ def infer_type_builtins(builtin):
     return Callable[params_type, return_type]
 
 
+@cache_by_identity
 def get_args(type_):
     if is_parameterized(type_):
         ret = type_.__args__
@@ -38,6 +38,17 @@ def test_parameterized():
     assert not is_parameterized(SupportsInt)
 
 
+def test_type_predicates_distinguish_equal_generics():
+    assert Set == Set[T]
+    for _ in range(2):
+        assert is_parametrical(Set)
+        assert not is_parametrical(Set[T])
+        assert not is_parameterized(Set)
+        assert is_parameterized(Set[T])
+        assert get_args(Set) == tuple()
+        assert get_args(Set[T]) == (T,)
+
+
 def test_get_type_args():
     args = get_args(AbstractSet)
     assert args == tuple()
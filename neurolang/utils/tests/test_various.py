@@ -0,0 +1,26 @@
+from ..various import cache_by_identity
+
+
+def test_cache_by_identity():
+    calls = []
+
+    def first(sequence):
+        calls.append(sequence)
+        return sequence[0]
+
+    cached = cache_by_identity(first, maxsize=2)
+    a = [1]
+    b = [1]
+    assert cached(a) == 1
+    assert cached(b) == 1
+    assert cached(a) == 1
+    assert calls == [a, b]
+    assert calls[0] is a and calls[1] is b
+
+    cached([2])
+    cached(a)
+    assert len(calls) == 4
+
+    cached.cache_clear()
+    cached(a)
+    assert len(calls) == 5
@@ -1,6 +1,7 @@
 import logging
 import time
 from contextlib import contextmanager
+from functools import wraps
 from itertools import chain, combinations
 
 
@@ -51,3 +52,43 @@ def log_performance(
 def powerset(iterable):
     s = list(iterable)
     return chain.from_iterable(combinations(s, r) for r in range(len(s)+1))
+
+
+def cache_by_identity(function, maxsize=1024):
+    """Memoise `function` on the identity of its arguments.
+
+    Unlike `functools.lru_cache`, arguments are neither hashed nor
+    compared for equality. This suits arguments whose hash is costly
+    to compute or whose equality does not imply equivalence.
+
+    Parameters
+    ----------
+    function : callable
+        Function to memoise. The cached results are shared between
+        calls and must not be modified.
+    maxsize : int, optional
+        Number of results after which the memo is cleared,
+        by default 1024.
+
+    Returns
+    -------
+    callable
+        Memoised function, with a `cache_clear` method. Cached
+        arguments are kept alive until the memo is cleared, such that
+        their ids are not reused.
+    """
+    cache = {}
+
+    @wraps(function)
+    def wrapper(*args):
+        key = tuple(id(arg) for arg in args)
+        if key in cache:
+            return cache[key][1]
+        result = function(*args)
+        if len(cache) >= maxsize:
+            cache.clear()
+        cache[key] = (args, result)
+        return result
+
+    wrapper.cache_clear = cache.clear
+    return wrapper